@@ -0,0 +1,329 @@
+"""
+Deterministic benchmark suite for 03.03.2025.claude-auto-app.py
+
+Everything runs offline: result pages come from the recorded fixtures in
+fixtures/, job corpora are generated from a fixed seed, resume and cover letter
+templates are written on the fly, Drive is a temporary folder and Calendar is a
+local stand-in server. Each benchmark reports throughput and peak Python heap,
+and each run is compared with a stored baseline to flag regressions.
+
+    python 03.03.2025.claude-auto-app-bench.py                    # run and compare
+    python 03.03.2025.claude-auto-app-bench.py --update-baseline  # record a new baseline
+    python 03.03.2025.claude-auto-app-bench.py --sizes 1000 10000 100000
+"""
+import argparse
+import contextlib
+import email
+import gc
+import importlib.util
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import requests
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(HERE, '03.03.2025.claude-auto-app.py')
+FIXTURE_DIR = os.path.join(HERE, 'fixtures')
+BASELINE_PATH = os.path.join(FIXTURE_DIR, 'bench_baseline.json')
+
+KEYWORDS = "cybersecurity IT project management CISSP PMP"
+DEFAULT_SIZES = (1000, 10000)
+
+
+def load_app(path=APP_PATH):
+    """Import the Colab script as a module (its bootstrap only runs under __main__)"""
+    spec = importlib.util.spec_from_file_location('job_app', path)
+    module = importlib.util.module_from_spec(spec)
+    # Registered so process-pool workers can unpickle the module's functions
+    sys.modules['job_app'] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+# Synthetic inputs
+TITLES = ['Security Analyst', 'IT Project Manager', 'Cybersecurity Engineer', 'PMO Lead', 'Network Engineer',
+          'SOC Analyst', 'Cloud Security Architect', 'Program Manager', 'Systems Administrator', 'GRC Specialist']
+COMPANIES = ['Contoso', 'Fabrikam', 'Northwind', 'Proseware', 'Litware', 'Adatum', 'Tailspin', 'Woodgrove',
+             'Wingtip', 'Fourth Coffee', 'Alpine Ski House', 'Humongous Insurance']
+LOCATIONS = ['New York, NY', 'Remote', 'Austin, TX', 'Chicago, IL', 'Seattle, WA']
+VOCABULARY = ('cybersecurity security incident response cloud aws azure network firewall siem splunk '
+              'project management pmp cissp agile scrum stakeholder budget risk compliance governance '
+              'vendor infrastructure migration python automation monitoring vulnerability threat audit '
+              'identity access policy endpoint detection team leadership communication roadmap delivery '
+              'it the and with for our you will to of in on a as an experience years required preferred').split()
+
+
+def synthetic_corpus(size, seed=0, words_per_description=120):
+    """size job rows with JobStore columns, identical for a given seed"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(size):
+        title = f"{rng.choice(TITLES)} {rng.choice(['', 'II', 'III', 'Senior', 'Lead'])}".strip()
+        rows.append({
+            'Title': title,
+            'Company': rng.choice(COMPANIES),
+            'Location': rng.choice(LOCATIONS),
+            'Description': ' '.join(rng.choice(VOCABULARY) for _ in range(words_per_description)),
+            'URL': f"https://jobs.example.com/view/{seed}-{i}",
+            'Date_Posted': '2025-03-03',
+            'Keywords_Match': 0,
+        })
+    return rows
+
+
+def make_templates(directory):
+    """Write sample resume and cover letter templates with the placeholders the customizer fills"""
+    from docx import Document
+    resume = Document()
+    resume.add_heading('Jordan Example', level=1)
+    resume.add_paragraph('[OBJECTIVE]')
+    resume.add_heading('Experience', level=2)
+    for line in ['Led incident response for a cloud security program across AWS and Azure',
+                 'Managed infrastructure migration projects with agile delivery and stakeholder reporting',
+                 'Built SIEM monitoring and vulnerability management automation in Python',
+                 'Owned risk, compliance and audit readiness for identity and access policy']:
+        resume.add_paragraph(line, style='List Bullet')
+    resume.add_heading('Certifications', level=2)
+    resume.add_paragraph('CISSP, PMP')
+    resume_path = os.path.join(directory, 'Resume_Template.docx')
+    resume.save(resume_path)
+
+    cover_letter = Document()
+    cover_letter.add_paragraph('[DATE]')
+    cover_letter.add_paragraph('Dear Hiring Team at [COMPANY_NAME],')
+    cover_letter.add_paragraph('I am applying for the [JOB_TITLE] role. My background in [KEYWORD1], '
+                               '[KEYWORD2] and [KEYWORD3] matches what your team needs.')
+    cover_letter.add_paragraph('Sincerely,\nJordan Example')
+    cover_letter_path = os.path.join(directory, 'Cover_Letter_Template.docx')
+    cover_letter.save(cover_letter_path)
+    return resume_path, cover_letter_path
+
+
+def fixture_response(name, url):
+    """A requests.Response carrying a recorded fixture page, as the fetch engine would return it"""
+    response = requests.Response()
+    with open(os.path.join(FIXTURE_DIR, name), 'rb') as f:
+        response._content = f.read()
+    response.status_code = 200
+    response.url = url
+    response.encoding = 'utf-8'
+    return response
+
+
+# Calendar stand-in: accepts single inserts and multipart batch calls, 409 for a known event id
+class _CalendarHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    events = {}
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _insert(self, body):
+        event = json.loads(body or '{}')
+        with self.lock:
+            if event.get('id') in self.events:
+                return 409, {'error': {'code': 409, 'message': 'The requested identifier already exists.'}}
+            event.setdefault('id', f"event{len(self.events)}")
+            self.events[event['id']] = event
+        return 200, event
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.path.startswith('/batch/'):
+            message = email.message_from_bytes(b'Content-Type: ' + self.headers['Content-Type'].encode() +
+                                               b'\r\n\r\n' + body)
+            parts = []
+            for part in message.get_payload():
+                content_id = ' '.join(str(part['Content-ID']).split())
+                inner = part.get_payload()
+                separator = '\r\n\r\n' if '\r\n\r\n' in inner else '\n\n'
+                status, result = self._insert(inner.partition(separator)[2])
+                parts.append(f"--batch_response\r\nContent-Type: application/http\r\n"
+                             f"Content-ID: {content_id.replace('<', '<response-', 1)}\r\n\r\n"
+                             f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\n\r\n{json.dumps(result)}\r\n")
+            payload = (''.join(parts) + '--batch_response--\r\n').encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'multipart/mixed; boundary=batch_response')
+        else:
+            status, result = self._insert(body.decode())
+            payload = json.dumps(result).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def start_calendar_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _CalendarHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+# Measurement
+def measure(run, items, setup=None, repeat=3):
+    """
+    Best-of-repeat wall time for run(state) (setup() builds state outside the timing),
+    then one more pass under tracemalloc for the peak Python heap.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        state = setup() if setup else None
+        gc.collect()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            run(state)
+        best = min(best, time.perf_counter() - start)
+
+    state = setup() if setup else None
+    gc.collect()
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        run(state)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'seconds': best, 'items': items, 'per_second': items / best if best else float('inf'),
+            'peak_kib': peak / 1024}
+
+
+def run_benchmarks(app, sizes=DEFAULT_SIZES, repeat=3, pages=200, documents=20, batch_jobs=10):
+    results = {}
+    drive = tempfile.mkdtemp(prefix='bench_drive_')
+    app.DRIVE_DIR = drive + os.sep
+    # Documents go to local scratch and are synced into the stand-in Drive folder in the background
+    app.configure_output(os.path.join(drive, 'scratch'), drive)
+    resume_path, cover_letter_path = make_templates(drive)
+
+    # Result-page parsing, as done by search_indeed / search_linkedin and the detail pipeline
+    retriever = app.JobRetriever()
+    indeed = fixture_response('indeed_search.html', 'https://www.indeed.com/jobs')
+    linkedin = fixture_response('linkedin_search.html', 'https://www.linkedin.com/jobs/search')
+    detail = fixture_response('linkedin_job.html', 'https://www.linkedin.com/jobs/view/1')
+    results['parse_indeed_page'] = measure(
+        lambda _: [retriever._parse_indeed_page(indeed, KEYWORDS) for _ in range(pages)], pages, repeat=repeat)
+    results['parse_linkedin_page'] = measure(
+        lambda _: [retriever._parse_linkedin_page(linkedin, KEYWORDS) for _ in range(pages)], pages, repeat=repeat)
+    results['parse_linkedin_description'] = measure(
+        lambda _: [retriever._parse_linkedin_description(detail) for _ in range(pages)], pages, repeat=repeat)
+
+    scorer = app.KeywordScorer(KEYWORDS)
+    for size in sizes:
+        corpus = synthetic_corpus(size)
+        jobs_df = app.pd.DataFrame(corpus)
+        descriptions = jobs_df['Description']
+        term_index = app.TermIndex(jobs_df)
+
+        # Keywords_Match scoring: regex pass, sparse term index build, and re-ranking on the index
+        results[f'score_regex[{size}]'] = measure(lambda _: scorer.score(jobs_df), size, repeat=repeat)
+        results[f'term_index[{size}]'] = measure(lambda _: app.TermIndex(jobs_df), size, repeat=repeat)
+        results[f'score_indexed[{size}]'] = measure(lambda _: scorer.score(jobs_df, term_index), size, repeat=repeat)
+        results[f'store_upsert[{size}]'] = measure(
+            lambda store: store.upsert('jobs', corpus), size, setup=app.JobStore, repeat=repeat)
+
+        # extract_job_keywords: one fit over the corpus, then per-description lookups
+        results[f'keywords_fit[{size}]'] = measure(
+            lambda _: app.KeywordExtractor().fit(descriptions), size, repeat=repeat)
+        extractor = app.KeywordExtractor().fit(descriptions)
+        lookups = descriptions.iloc[:min(size, 1000)].tolist()
+        results[f'extract_job_keywords[{size}]'] = measure(
+            lambda _: [extractor.keywords_for(d) for d in lookups], len(lookups),
+            setup=lambda: extractor.keywords.clear(), repeat=repeat)
+
+    # Document generation into local scratch
+    jobs = synthetic_corpus(documents, seed=1)
+    customizer = app.DocumentCustomizer(resume_path, cover_letter_path)
+    customizer.fit_keywords([job['Description'] for job in synthetic_corpus(max(sizes), seed=2)])
+    results['customize_resume'] = measure(
+        lambda _: [customizer.customize_resume(j['Title'], j['Company'], j['Description']) for j in jobs],
+        documents, repeat=repeat)
+    results['customize_cover_letter'] = measure(
+        lambda _: [customizer.customize_cover_letter(j['Title'], j['Company'], j['Description']) for j in jobs],
+        documents, repeat=repeat)
+
+    # End to end: filter, documents, batched reminders and records, against the Calendar stand-in
+    server, api_root = start_calendar_server()
+    corpus = synthetic_corpus(min(sizes), seed=3)
+
+    def batch_setup():
+        _CalendarHandler.events.clear()
+        store = app.JobStore()
+        store.upsert('jobs', corpus)
+        manager = app.JobApplicationManager(resume_path, cover_letter_path, store=store, calendar_api_root=api_root)
+        manager.job_retriever.scorer = app.KeywordScorer(KEYWORDS)
+        return manager
+    results['batch_process_jobs'] = measure(
+        lambda manager: manager.batch_process_jobs(num_jobs=batch_jobs, workers=1), batch_jobs,
+        setup=batch_setup, repeat=repeat)
+    server.shutdown()
+    app.get_output().close()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print every benchmark next to its baseline; return the names that regressed beyond tolerance"""
+    regressions = []
+    print(f"\n{'benchmark':<34}{'items/s':>14}{'peak KiB':>12}{'baseline/s':>14}{'change':>10}")
+    for name, result in results.items():
+        reference = baseline.get(name)
+        line = f"{name:<34}{result['per_second']:>14,.1f}{result['peak_kib']:>12,.0f}"
+        if reference:
+            change = result['per_second'] / reference['per_second'] - 1
+            memory_change = result['peak_kib'] / max(reference['peak_kib'], 1) - 1
+            flag = ''
+            if change < -tolerance or memory_change > tolerance:
+                regressions.append(name)
+                flag = '  REGRESSION' + (' (memory)' if memory_change > tolerance else '')
+            line += f"{reference['per_second']:>14,.1f}{change:>+10.0%}{flag}"
+        else:
+            line += f"{'-':>14}{'new':>10}"
+        print(line)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help='synthetic corpus sizes (jobs)')
+    parser.add_argument('--repeat', type=int, default=3, help='timed passes per benchmark (best is kept)')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true', help='store this run as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.3,
+                        help='allowed throughput drop / peak memory growth before a run counts as a regression')
+    args = parser.parse_args(argv)
+
+    app = load_app()
+    results = run_benchmarks(app, sizes=args.sizes, repeat=args.repeat)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+    elif not args.update_baseline:
+        print(f"No baseline at {args.baseline}; run with --update-baseline to record one")
+    regressions = compare(results, baseline, args.tolerance)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'python': sys.version.split()[0], 'cpus': os.cpu_count(), 'results': results}, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+    if not baseline:
+        return 0
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("\nNo regressions against the baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
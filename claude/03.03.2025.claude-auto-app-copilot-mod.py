@@ -89,7 +89,8 @@ class DocumentCustomizer:
 
     def extract_job_keywords(self, job_description):
         tokens = word_tokenize(job_description.lower())
-        filtered_tokens = [word for word in tokens if word.isalnum() and word not in stopwords.words('english')]
+        stop_words = set(stopwords.words('english'))
+        filtered_tokens = [word for word in tokens if word.isalnum() and word not in stop_words]
         vectorizer = TfidfVectorizer(max_features=20)
         tfidf_matrix = vectorizer.fit_transform([' '.join(filtered_tokens)])
         feature_names = vectorizer.get_feature_names_out()
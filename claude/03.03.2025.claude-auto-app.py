@@ -1,321 +1,2661 @@
+import time
 import requests
-import pandas as pd
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+import importlib
+import functools
 import re
+import math
 import os
-from bs4 import BeautifulSoup
+import sys
+import subprocess
 from datetime import datetime, timedelta
 import pickle
 import io
-from google.colab import drive
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
-from google.oauth2.credentials import Credentials
-from docx import Document
-import nltk
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from sklearn.feature_extraction.text import TfidfVectorizer
-from datetime import datetime, timedelta
+import random
+import threading
+import queue
+import json
+import sqlite3
+import hashlib
+import shutil
+import zlib
+import resource
+import tracemalloc
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urljoin, urlparse, urlunparse, urlencode, parse_qsl
 
-# Mount Google Drive to access files
-drive.mount('/content/drive')
 
-# Install required packages
-!pip install python-docx google-api-python-client google-auth-httplib2 google-auth-oauthlib beautifulsoup4 nltk
+class _LazyModule:
+    """Stand-in for a heavy module that is only imported on first attribute access"""
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+    
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
 
-# Download NLTK data
-nltk.download('punkt')
-nltk.download('stopwords')
 
-# 1. Job Retrieval Component
-class JobRetriever:
-    def __init__(self):
-        self.jobs_df = pd.DataFrame(columns=['Title', 'Company', 'Location', 'Description', 'URL', 'Date_Posted', 'Keywords_Match'])
+# pandas, numpy, scikit-learn, python-docx and the Google clients are imported where they
+# are first needed, so importing this script or running a search-only session starts fast
+pd = _LazyModule('pandas')
+np = _LazyModule('numpy')
+
+# Packages the pipeline needs in a fresh Colab runtime
+REQUIRED_PACKAGES = ['python-docx', 'google-api-python-client', 'google-auth-httplib2', 'google-auth-oauthlib',
+                     'beautifulsoup4', 'nltk', 'lxml']
+# Folder for templates, Calendar credentials and the synced copies of generated output (the mounted Drive in Colab)
+DRIVE_DIR = os.environ.get('JOB_APP_DRIVE_DIR', '/content/drive/My Drive/')
+# Fast local scratch that documents and CSV exports are written to before being synced to DRIVE_DIR
+OUTPUT_DIR = os.environ.get('JOB_APP_OUTPUT_DIR', '/content/job_output/')
+_bootstrapped = False
+
+
+def bootstrap(mount_drive=True, install_packages=True, nltk_packages=('stopwords',)):
+    """
+    One-time environment setup: mount Google Drive (in Colab), install required
+    packages and fetch NLTK data. Safe to call again; later calls do nothing.
+    """
+    global _bootstrapped
+    if _bootstrapped:
+        return
+    
+    # Mount Google Drive to access files
+    if mount_drive:
+        try:
+            from google.colab import drive
+            drive.mount('/content/drive')
+        except ImportError:
+            print("Not running in Colab, skipping Drive mount")
+    
+    # Install required packages
+    if install_packages:
+        subprocess.run([sys.executable, '-m', 'pip', 'install', '-q', *REQUIRED_PACKAGES], check=False)
+    
+    # Download NLTK data
+    if nltk_packages:
+        import nltk
+        for package in nltk_packages:
+            nltk.download(package, quiet=True)
+    _bootstrapped = True
+
+
+def check_startup_time(script_path=None, budget=1.0):
+    """
+    Measure a cold start in a fresh interpreter: import this script and build a
+    search-only JobApplicationManager. Prints the timing and returns True if it fits the budget.
+    """
+    script_path = script_path or globals().get('__file__')
+    if not script_path or not os.path.exists(script_path):
+        print("check_startup_time needs the path of this script (e.g. after saving the notebook as .py)")
+        return False
+    probe = (
+        "import runpy, time\n"
+        "start = time.perf_counter()\n"
+        f"namespace = runpy.run_path({script_path!r}, run_name='job_app_probe')\n"
+        "imported = time.perf_counter()\n"
+        "namespace['JobApplicationManager']('resume.docx', 'cover_letter.docx')\n"
+        "print(imported - start, time.perf_counter() - start)\n"
+    )
+    result = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"Startup probe failed: {result.stderr.strip()}")
+        return False
+    import_seconds, ready_seconds = map(float, result.stdout.split()[-2:])
+    within_budget = ready_seconds <= budget
+    print(f"Cold start: import {import_seconds:.3f}s, search-ready {ready_seconds:.3f}s "
+          f"({'within' if within_budget else 'OVER'} the {budget:.1f}s budget)")
+    return within_budget
+
+# 0. HTTP Fetch Engine
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Per-source settings: where to search, how results are paged and how hard we may hit the site
+JOB_SOURCES = {
+    'indeed': {
+        'base_url': 'https://www.indeed.com/jobs',
+        'page_size': 10,
+        'pages': 5,
+        'max_pages': 10,   # cap when several keyword profiles share one query
+        'or_operator': ' or ',
+        'rate_limit': 10.0,   # requests per second
+        'burst': 10,
+        'cache_ttl': 60 * 60,   # seconds a cached page is served without revalidation
+    },
+    'linkedin': {
+        'base_url': 'https://www.linkedin.com/jobs/search',
+        'page_size': 25,
+        'pages': 2,
+        'max_pages': 4,
+        'or_operator': ' OR ',
+        'rate_limit': 5.0,
+        'burst': 5,
+        'cache_ttl': 6 * 60 * 60,
+    },
+}
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def query_text(source, keywords):
+    """Search box text for a keyword string, or for a tuple of keyword sets joined with the source's OR"""
+    if isinstance(keywords, tuple):
+        if len(keywords) == 1:
+            return keywords[0]
+        return JOB_SOURCES[source]['or_operator'].join(f"({clause})" for clause in keywords)
+    return keywords
+
+
+class CacheMissError(requests.RequestException):
+    """Raised in replay-only mode when a request has no recorded response"""
+
+
+class ResponseCache:
+    """
+    Persistent on-disk cache of HTTP responses, stored in a single SQLite file.
+    Entries are keyed by normalized URL plus params, expire after a per-source TTL,
+    are revalidated with ETag/Last-Modified and evicted least-recently-used once the
+    cache grows past max_bytes. With replay_only=True it never touches the network.
+    """
+    def __init__(self, path, max_bytes=200 * 1024 * 1024, ttls=None, default_ttl=60 * 60, replay_only=False):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = ttls if ttls is not None else {name: source['cache_ttl'] for name, source in JOB_SOURCES.items()}
+        self.default_ttl = default_ttl
+        self.replay_only = replay_only
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'stored': 0, 'evicted': 0}
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                status INTEGER,
+                headers TEXT,
+                body BLOB,
+                size INTEGER,
+                stored_at REAL,
+                last_access REAL
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+        self.conn.commit()
     
-    def search_indeed(self, keywords, location, pages=5):
+    @staticmethod
+    def cache_key(url, params=None):
+        """Normalize scheme/host case, drop fragments and sort query parameters"""
+        prepared = requests.Request('GET', url, params=params).prepare().url
+        parts = urlparse(prepared)
+        query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+        return urlunparse((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', '', query, ''))
+    
+    def lookup(self, key, source=None):
         """
-        Scrape job listings from Indeed based on keywords and location
+        Return (response, fresh) for a cached entry, or (None, False) when there is none.
+        Stale entries are returned too so the caller can revalidate them.
         """
-        print(f"Searching Indeed for {keywords} in {location}...")
-        base_url = "https://www.indeed.com/jobs"
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT url, status, headers, body, stored_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.stats['misses'] += 1
+                return None, False
+            self.conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.conn.commit()
         
-        all_jobs = []
-        for page in range(pages):
-            params = {
-                'q': keywords,
-                'l': location,
-                'start': page * 10
-            }
+        url, status, headers, body, stored_at = row
+        fresh = self.replay_only or time.time() - stored_at < self.ttls.get(source, self.default_ttl)
+        if fresh:
+            with self.lock:
+                self.stats['hits'] += 1
+        return self._build_response(url, status, json.loads(headers), body), fresh
+    
+    def validators(self, cached):
+        """Conditional request headers for revalidating a stale entry"""
+        headers = {}
+        if cached.headers.get('ETag'):
+            headers['If-None-Match'] = cached.headers['ETag']
+        if cached.headers.get('Last-Modified'):
+            headers['If-Modified-Since'] = cached.headers['Last-Modified']
+        return headers
+    
+    def touch(self, key):
+        """Mark a revalidated (304) entry as fresh again"""
+        with self.lock:
+            now = time.time()
+            self.conn.execute("UPDATE responses SET stored_at = ?, last_access = ? WHERE key = ?", (now, now, key))
+            self.conn.commit()
+            self.stats['revalidated'] += 1
+    
+    def store(self, key, response):
+        """Record a successful response and evict old entries if the cache is over budget"""
+        if response.status_code != 200:
+            return
+        headers = {name: value for name, value in response.headers.items()
+                   if name.lower() in ('content-type', 'etag', 'last-modified')}
+        body = response.content
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, url, status, headers, body, size, stored_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, response.url, response.status_code, json.dumps(headers), body, len(body), now, now))
+            self.stats['stored'] += 1
+            self._evict()
+            self.conn.commit()
+    
+    def _evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used entries until we are back under budget
+        for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall():
+            self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.stats['evicted'] += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+    
+    @staticmethod
+    def _build_response(url, status, headers, body):
+        response = requests.Response()
+        response.status_code = status
+        response.url = url
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = body
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        return response
+    
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class TokenBucket:
+    """Thread-safe token bucket that spaces out requests to a single source"""
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(burst))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a token is available, then consume it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class FetchEngine:
+    """
+    Connection-pooled HTTP client shared by all job sources.
+    Requests run on a thread pool with a per-host concurrency cap, a token-bucket
+    rate limit per source and exponential backoff on transient failures.
+    """
+    def __init__(self, max_workers=16, per_host_limit=4, max_retries=3, backoff=0.5, timeout=15, sources=None, cache=None):
+        self.cache = cache
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        
+        # One keep-alive session for every request so TCP/TLS connections get reused
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['User-Agent'] = USER_AGENT
+        
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.lock = threading.Lock()
+        self.host_limits = {}
+        self.buckets = {}
+        for name, source in (sources or JOB_SOURCES).items():
+            self.buckets[name] = TokenBucket(source['rate_limit'], source.get('burst', 1))
+        self.stats = {'requests': 0, 'retries': 0, 'failures': 0}
+    
+    def _host_limit(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            if host not in self.host_limits:
+                self.host_limits[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self.host_limits[host]
+    
+    def _count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+        metrics.incr('fetch.' + key)
+    
+    def fetch(self, url, params=None, headers=None, source=None, counters=None):
+        """
+        GET a URL, retrying connection errors and retryable status codes with backoff.
+        Retries are also tallied into the optional counters dict.
+        """
+        if self.cache is None:
+            return self._fetch(url, params, headers, source, counters)
+        
+        key = self.cache.cache_key(url, params)
+        cached, fresh = self.cache.lookup(key, source)
+        if cached is not None and fresh:
+            metrics.incr('pages.cached')
+            return cached
+        if self.cache.replay_only:
+            raise CacheMissError(f"No recorded response for {key}")
+        
+        if cached is not None:
+            headers = {**(headers or {}), **self.cache.validators(cached)}
+        response = self._fetch(url, params, headers, source, counters)
+        if cached is not None and response.status_code == 304:
+            self.cache.touch(key)
+            metrics.incr('pages.revalidated')
+            return cached
+        self.cache.store(key, response)
+        return response
+    
+    def _fetch(self, url, params=None, headers=None, source=None, counters=None):
+        bucket = self.buckets.get(source)
+        for attempt in range(self.max_retries + 1):
+            if bucket:
+                bucket.acquire()
+            retry_after = None
+            try:
+                with self._host_limit(url), metrics.timer('fetch.latency'):
+                    self._count('requests')
+                    response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUS_CODES:
+                    metrics.incr('pages.fetched')
+                    return response
+                retry_after = response.headers.get('Retry-After')
+                error = requests.HTTPError(f"{response.status_code} for {response.url}", response=response)
+            except requests.RequestException as e:
+                error = e
             
-            # Add user agent to avoid being blocked
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+            if attempt == self.max_retries:
+                self._count('failures')
+                raise error
+            self._count('retries')
+            if counters is not None:
+                with self.lock:
+                    counters['retried'] = counters.get('retried', 0) + 1
+            delay = self.backoff * (2 ** attempt) * (0.5 + random.random() / 2)
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            time.sleep(delay)
+    
+    def submit(self, url, params=None, headers=None, source=None):
+        """Schedule a fetch on the pool and return its Future"""
+        return self.executor.submit(self.fetch, url, params, headers, source)
+    
+    def fetch_many(self, requests_list):
+        """
+        Fetch a list of request dicts (url, params, headers, source) concurrently.
+        Returns (request, response, error) tuples in the original order.
+        """
+        futures = [self.submit(req['url'], req.get('params'), req.get('headers'), req.get('source')) for req in requests_list]
+        results = []
+        for req, future in zip(requests_list, futures):
+            try:
+                results.append((req, future.result(), None))
+            except Exception as e:
+                results.append((req, None, e))
+        return results
+    
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.session.close()
+
+
+class DetailPipeline:
+    """
+    Producer/consumer stage that fills in job descriptions from detail pages.
+    Search pages put card stubs on a bounded queue; a fixed pool of workers fetches
+    the detail pages concurrently and hands finished rows to on_rows in batches.
+    """
+    def __init__(self, fetcher, parse_description, on_rows, known_descriptions=None,
+                 source='linkedin', workers=8, batch_size=25):
+        self.fetcher = fetcher
+        self.parse_description = parse_description
+        self.on_rows = on_rows
+        self.known_descriptions = known_descriptions or {}
+        self.source = source
+        self.batch_size = batch_size
+        self.queue = queue.Queue(maxsize=workers * 4)
+        self.lock = threading.Lock()
+        self.seen_urls = set()
+        self.pending_rows = []
+        self.stats = {'queued': 0, 'fetched': 0, 'reused': 0, 'duplicates': 0, 'failed': 0, 'retried': 0}
+        self.workers = [threading.Thread(target=self._worker, daemon=True) for _ in range(workers)]
+        for worker in self.workers:
+            worker.start()
+    
+    def put(self, stub):
+        """Queue a card stub; stubs already seen or with a known description never hit the network"""
+        url = stub['URL']
+        with self.lock:
+            if url in self.seen_urls:
+                self.stats['duplicates'] += 1
+                return
+            self.seen_urls.add(url)
+        
+        if url == "N/A":
+            self._emit(stub)
+        elif url in self.known_descriptions:
+            stub['Description'] = self.known_descriptions[url]
+            with self.lock:
+                self.stats['reused'] += 1
+            self._emit(stub)
+        else:
+            with self.lock:
+                self.stats['queued'] += 1
+            self.queue.put(stub)
+    
+    def _worker(self):
+        while True:
+            stub = self.queue.get()
+            if stub is None:
+                self.queue.task_done()
+                return
+            try:
+                response = self.fetcher.fetch(stub['URL'], source=self.source, counters=self.stats)
+                stub['Description'] = self.parse_description(response)
+                with self.lock:
+                    self.stats['fetched'] += 1
+            except Exception as e:
+                with self.lock:
+                    self.stats['failed'] += 1
+                print(f"Error fetching job details from {stub['URL']}: {str(e)}")
+            self._emit(stub)
+            self.queue.task_done()
+    
+    def _emit(self, row):
+        with self.lock:
+            self.pending_rows.append(row)
+            if len(self.pending_rows) < self.batch_size:
+                return
+            rows, self.pending_rows = self.pending_rows, []
+        self.on_rows(rows)
+    
+    def close(self):
+        """Wait for the queue to drain, stop the workers and flush the last rows"""
+        for _ in self.workers:
+            self.queue.put(None)
+        for worker in self.workers:
+            worker.join()
+        with self.lock:
+            rows, self.pending_rows = self.pending_rows, []
+        if rows:
+            self.on_rows(rows)
+        return self.stats
+
+# 0b. HTML Card Parsers
+# Fields pulled from each result card: name -> (tag, class, attribute); attribute None means the element text
+CARD_SELECTORS = {
+    'indeed': {
+        'card': ('div', 'jobsearch-SerpJobCard'),
+        'fields': {
+            'title': ('a', 'jobtitle', None),
+            'href': ('a', 'jobtitle', 'href'),
+            'company': ('span', 'company', None),
+            'location': ('div', 'recJobLoc', 'data-rc-loc'),
+            'description': ('div', 'summary', None),
+            'posted': ('span', 'date', None),
+        },
+    },
+    'linkedin': {
+        'card': ('div', 'base-card'),
+        'fields': {
+            'title': ('h3', 'base-search-card__title', None),
+            'company': ('h4', 'base-search-card__subtitle', None),
+            'location': ('span', 'job-search-card__location', None),
+            'href': ('a', 'base-card__full-link', 'href'),
+            # Postings from the last day carry only a '--new' variant of this class and fall back to today
+            'posted': ('time', 'job-search-card__listdate', 'datetime'),
+        },
+    },
+}
+DESCRIPTION_SELECTOR = ('div', 'description__text')
+POSTED_AGE_PATTERN = re.compile(r'(\d+)\+?\s*(minute|hour|day|week|month)')
+POSTED_AGE_DAYS = {'minute': 0, 'hour': 0, 'day': 1, 'week': 7, 'month': 30}
+
+
+def posting_date(text, today=None):
+    """
+    Turn a card's posting date ('2024-03-01', 'Just posted', 'Yesterday', '3 days ago',
+    '30+ days ago') into YYYY-MM-DD; None when there is no recognizable date.
+    """
+    if not text:
+        return None
+    text = text.strip().lower()
+    today = today or datetime.now()
+    if re.match(r'\d{4}-\d{2}-\d{2}', text):
+        return text[:10]
+    if 'just posted' in text or 'today' in text:
+        return today.strftime("%Y-%m-%d")
+    if 'yesterday' in text:
+        return (today - timedelta(days=1)).strftime("%Y-%m-%d")
+    match = POSTED_AGE_PATTERN.search(text)
+    if match:
+        days = int(match.group(1)) * POSTED_AGE_DAYS[match.group(2)]
+        return (today - timedelta(days=days)).strftime("%Y-%m-%d")
+    return None
+
+
+class CardParser:
+    """
+    Base class for HTML parser backends. parse_cards returns one dict per result card
+    mapping field names from CARD_SELECTORS to a stripped string, or None when missing.
+    """
+    name = 'base'
+    
+    def parse_cards(self, html, source):
+        raise NotImplementedError
+    
+    def parse_description(self, html):
+        raise NotImplementedError
+
+
+class SoupCardParser(CardParser):
+    """Pure-Python fallback: BeautifulSoup restricted to the card subtrees with a SoupStrainer"""
+    name = 'html.parser'
+    
+    def __init__(self):
+        from bs4 import BeautifulSoup, SoupStrainer
+        self.soup = BeautifulSoup
+        self.strainer = SoupStrainer
+    
+    def _strainer(self, tag, css_class):
+        # While parsing, the class attribute is still one string, so match on its tokens
+        return self.strainer(tag, class_=lambda value: value is not None and css_class in value.split())
+    
+    def parse_cards(self, html, source):
+        spec = CARD_SELECTORS[source]
+        card_tag, card_class = spec['card']
+        soup = self.soup(html, 'html.parser', parse_only=self._strainer(card_tag, card_class))
+        
+        cards = []
+        for card in soup.find_all(card_tag, class_=card_class):
+            fields = {}
+            for field, (tag, css_class, attr) in spec['fields'].items():
+                elem = card.find(tag, class_=css_class)
+                if elem is None:
+                    fields[field] = None
+                elif attr:
+                    fields[field] = elem.get(attr)
+                else:
+                    fields[field] = elem.text.strip()
+            cards.append(fields)
+        return cards
+    
+    def parse_description(self, html):
+        tag, css_class = DESCRIPTION_SELECTOR
+        soup = self.soup(html, 'html.parser', parse_only=self._strainer(tag, css_class))
+        elem = soup.find(tag, class_=css_class)
+        return elem.text.strip() if elem else None
+
+
+class LxmlCardParser(CardParser):
+    """libxml2-backed parser with precompiled XPath selectors"""
+    name = 'lxml'
+    
+    def __init__(self):
+        from lxml import etree, html as lxml_html
+        self.lxml_html = lxml_html
+        
+        def has_class(tag, css_class, prefix):
+            return etree.XPath(f"{prefix}{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {css_class} ')]")
+        
+        self.cards = {}
+        for source, spec in CARD_SELECTORS.items():
+            card_tag, card_class = spec['card']
+            fields = {field: (has_class(tag, css_class, './/'), attr)
+                      for field, (tag, css_class, attr) in spec['fields'].items()}
+            self.cards[source] = (has_class(card_tag, card_class, '//'), fields)
+        self.description = has_class(*DESCRIPTION_SELECTOR, '//')
+    
+    def parse_cards(self, html, source):
+        card_xpath, fields = self.cards[source]
+        
+        cards = []
+        for card in card_xpath(self.lxml_html.fromstring(html)):
+            values = {}
+            for field, (xpath, attr) in fields.items():
+                found = xpath(card)
+                if not found:
+                    values[field] = None
+                elif attr:
+                    values[field] = found[0].get(attr)
+                else:
+                    values[field] = found[0].text_content().strip()
+            cards.append(values)
+        return cards
+    
+    def parse_description(self, html):
+        found = self.description(self.lxml_html.fromstring(html))
+        return found[0].text_content().strip() if found else None
+
+
+class SelectolaxCardParser(CardParser):
+    """Lexbor-backed parser using CSS selectors; the fastest backend when installed"""
+    name = 'selectolax'
+    
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self.html_parser = LexborHTMLParser
+        self.cards = {}
+        for source, spec in CARD_SELECTORS.items():
+            card_tag, card_class = spec['card']
+            fields = {field: (f"{tag}.{css_class}", attr) for field, (tag, css_class, attr) in spec['fields'].items()}
+            self.cards[source] = (f"{card_tag}.{card_class}", fields)
+        self.description = "{}.{}".format(*DESCRIPTION_SELECTOR)
+    
+    def parse_cards(self, html, source):
+        card_selector, fields = self.cards[source]
+        
+        cards = []
+        for card in self.html_parser(html).css(card_selector):
+            values = {}
+            for field, (selector, attr) in fields.items():
+                elem = card.css_first(selector)
+                if elem is None:
+                    values[field] = None
+                elif attr:
+                    values[field] = elem.attributes.get(attr)
+                else:
+                    values[field] = elem.text().strip()
+            cards.append(values)
+        return cards
+    
+    def parse_description(self, html):
+        elem = self.html_parser(html).css_first(self.description)
+        return elem.text().strip() if elem else None
+
+
+PARSER_BACKENDS = {
+    'selectolax': SelectolaxCardParser,
+    'lxml': LxmlCardParser,
+    'html.parser': SoupCardParser,
+}
+
+
+def get_card_parser(preferred=None):
+    """Return the requested parser backend, or the fastest one that is installed"""
+    names = [preferred] if preferred else list(PARSER_BACKENDS)
+    for name in names:
+        try:
+            return PARSER_BACKENDS[name]()
+        except ImportError:
+            continue
+    if preferred:
+        print(f"Parser backend {preferred} is not installed, falling back to html.parser")
+    return SoupCardParser()
+
+
+def _benchmark_parser_backend(name, pages, repeat):
+    """Time one backend over the fixture pages; run in a fresh process so peak RSS is its own"""
+    parser = PARSER_BACKENDS[name]()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tracemalloc.start()
+    results = {}
+    for page_name, (kind, html) in pages.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            if kind == 'description':
+                parsed = parser.parse_description(html)
+            else:
+                parsed = parser.parse_cards(html, kind)
+        elapsed = (time.perf_counter() - start) / repeat
+        results[page_name] = (elapsed * 1000, len(parsed) if kind != 'description' else int(bool(parsed)))
+    python_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    rss_growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+    return results, python_peak / 1024, rss_growth
+
+
+def benchmark_parsers(fixture_dir='fixtures', repeat=50):
+    """
+    Micro-benchmark every installed parser backend on the saved fixture pages.
+    Prints per-page parse time plus peak memory (Python heap via tracemalloc and
+    peak RSS growth, which also covers native lxml/selectolax allocations).
+    """
+    pages = {}
+    for page_name, kind in [('indeed_search.html', 'indeed'), ('linkedin_search.html', 'linkedin'),
+                            ('linkedin_job.html', 'description')]:
+        with open(os.path.join(fixture_dir, page_name), encoding='utf-8') as f:
+            pages[page_name] = (kind, f.read())
+    
+    context = multiprocessing.get_context('fork' if FORK_AVAILABLE else None)
+    report = {}
+    for name, backend in PARSER_BACKENDS.items():
+        try:
+            backend()
+        except ImportError:
+            print(f"{name}: not installed, skipped")
+            continue
+        with context.Pool(1) as pool:
+            results, python_peak_kb, rss_growth_kb = pool.apply(_benchmark_parser_backend, (name, pages, repeat))
+        report[name] = results
+        print(f"\n{name}  (peak Python heap {python_peak_kb:.0f} KiB, peak RSS growth {rss_growth_kb} KiB)")
+        for page_name, (ms, count) in results.items():
+            print(f"  {page_name:<24} {ms:8.3f} ms/page  ({count} items)")
+    return report
+
+# Forked workers inherit loaded templates and output settings; macOS offers fork but it is unsafe there
+FORK_AVAILABLE = 'fork' in multiprocessing.get_all_start_methods() and sys.platform != 'darwin'
+
+# 0c. Job Storage
+JOB_COLUMNS = ['Title', 'Company', 'Location', 'Description', 'URL', 'Date_Posted', 'Keywords_Match']
+APPLIED_COLUMNS = ['Title', 'Company', 'Location', 'URL', 'Application_Date',
+                   'Resume_Path', 'CoverLetter_Path', 'FollowUp_Set']
+
+
+class JobStore:
+    """
+    Append-only SQLite store behind JobRetriever.jobs_df and JobApplicationManager.applied_jobs.
+    Each table has a unique index on URL, so writes are upserts rather than DataFrame
+    copies, and a pandas frame is only materialized (and cached) when something reads it.
+    """
+    TABLES = {
+        'jobs': JOB_COLUMNS,
+        'applied_jobs': APPLIED_COLUMNS,
+    }
+    # On conflict these columns keep their stored value instead of being overwritten
+    KEEP_ON_CONFLICT = {
+        'jobs': ['Date_Posted'],
+        'applied_jobs': ['Application_Date'],
+    }
+    
+    def __init__(self, path=':memory:'):
+        self.path = path
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.RLock()
+        self.frames = {}
+        with self.lock:
+            for table, columns in self.TABLES.items():
+                column_defs = ', '.join(f'"{column}"' for column in columns)
+                self.conn.execute(f'CREATE TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY, {column_defs})')
+                self.conn.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS {table}_url ON {table} ("URL")')
+                # Every write stamps its rows with a new revision, so incremental indexes also see updates
+                if 'revision' not in {row[1] for row in self.conn.execute(f'PRAGMA table_info({table})')}:
+                    self.conn.execute(f'ALTER TABLE {table} ADD COLUMN revision INTEGER NOT NULL DEFAULT 0')
+                self.conn.execute(f'CREATE INDEX IF NOT EXISTS {table}_revision ON {table} (revision)')
+            self.revision = self.conn.execute('SELECT MAX(revision) FROM jobs').fetchone()[0] or 0
+            # Completed stages of each job's application, so interrupted batches resume where they stopped
+            self.conn.execute('CREATE TABLE IF NOT EXISTS journal (job_key TEXT NOT NULL, stage TEXT NOT NULL, '
+                              'value TEXT, updated TEXT, PRIMARY KEY (job_key, stage))')
+            # URLs each standing search has already returned, so incremental crawls only page through new postings
+            self.conn.execute('CREATE TABLE IF NOT EXISTS crawl_seen (query TEXT NOT NULL, url TEXT NOT NULL, '
+                              'first_seen TEXT, PRIMARY KEY (query, url))')
+            self.conn.commit()
+    
+    def upsert(self, table, rows):
+        """Insert rows, updating any row whose URL is already stored"""
+        if not rows:
+            return 0
+        columns = self.TABLES[table]
+        updates = []
+        for column in columns:
+            if column == 'URL' or column in self.KEEP_ON_CONFLICT[table]:
+                continue
+            if column == 'Description':
+                # Never replace a fetched description with a placeholder
+                updates.append(f'"Description" = CASE WHEN excluded."Description" = \'N/A\' '
+                               f'THEN {table}."Description" ELSE excluded."Description" END')
+            else:
+                updates.append(f'"{column}" = excluded."{column}"')
+        updates.append('revision = excluded.revision')
+        sql = (f'INSERT INTO {table} ({", ".join(f"{chr(34)}{c}{chr(34)}" for c in columns)}, revision) '
+               f'VALUES ({", ".join("?" for _ in columns)}, ?) '
+               f'ON CONFLICT("URL") DO UPDATE SET {", ".join(updates)}')
+        with self.lock:
+            self.revision += 1
+            # Rows without a URL are stored as NULL so they never collide with each other
+            values = [tuple(None if column == 'URL' and row.get('URL') == "N/A" else self._to_sql(row.get(column))
+                            for column in columns) + (self.revision,) for row in rows]
+            self.conn.executemany(sql, values)
+            self.conn.commit()
+            self.frames.pop(table, None)
+        return len(rows)
+    
+    @staticmethod
+    def _to_sql(value):
+        if hasattr(value, 'item'):
+            return value.item()
+        return value
+    
+    def frame(self, table):
+        """Return the table as a DataFrame, loading it from SQLite only when it changed"""
+        with self.lock:
+            if table not in self.frames:
+                columns = self.TABLES[table]
+                # Rows keep their store id as the index so other components can refer back to them
+                df = pd.read_sql_query(
+                    f'SELECT id, {", ".join(f"{chr(34)}{c}{chr(34)}" for c in columns)} FROM {table} ORDER BY id',
+                    self.conn, index_col='id')
+                df['URL'] = df['URL'].fillna("N/A")
+                if table == 'jobs':
+                    df['Keywords_Match'] = df['Keywords_Match'].fillna(0).astype(int)
+                else:
+                    df['FollowUp_Set'] = df['FollowUp_Set'].fillna(0).astype(bool)
+                self.frames[table] = df
+            return self.frames[table]
+    
+    def rows_since(self, revision, columns=('Title', 'Description')):
+        """
+        Job rows added or updated after a given store revision, as (id, revision, *columns),
+        for components that index incrementally
+        """
+        with self.lock:
+            return self.conn.execute(
+                f'SELECT id, revision, {", ".join(f"{chr(34)}{c}{chr(34)}" for c in columns)} FROM jobs '
+                f'WHERE revision > ? ORDER BY revision, id', (revision,)).fetchall()
+    
+    def record_stage(self, job_key, stage, value=None):
+        """Durably mark one stage of a job's application as done (value is stored as JSON)"""
+        with self.lock:
+            self.conn.execute('INSERT OR REPLACE INTO journal VALUES (?, ?, ?, ?)',
+                              (job_key, stage, json.dumps(value), datetime.now().isoformat(timespec='seconds')))
+            self.conn.commit()
+    
+    def journal(self, job_keys):
+        """{job_key: {stage: value}} for the given jobs' completed stages"""
+        journal = {}
+        job_keys = list(job_keys)
+        with self.lock:
+            for start in range(0, len(job_keys), 500):
+                chunk = job_keys[start:start + 500]
+                for job_key, stage, value in self.conn.execute(
+                        f'SELECT job_key, stage, value FROM journal WHERE job_key IN ({", ".join("?" for _ in chunk)})',
+                        chunk):
+                    journal.setdefault(job_key, {})[stage] = json.loads(value)
+        return journal
+    
+    def clear_journal(self, job_keys=None):
+        """Forget completed stages (of the given jobs, or all) so they are redone on the next run"""
+        with self.lock:
+            if job_keys is None:
+                self.conn.execute('DELETE FROM journal')
+            else:
+                self.conn.executemany('DELETE FROM journal WHERE job_key = ?', [(key,) for key in job_keys])
+            self.conn.commit()
+    
+    def seen_urls(self, query):
+        """Every URL a search query has returned on earlier crawls"""
+        with self.lock:
+            return {url for (url,) in self.conn.execute('SELECT url FROM crawl_seen WHERE query = ?', (query,))}
+    
+    def mark_seen(self, query, urls):
+        """Raise a query's high-water mark to include urls"""
+        if not urls:
+            return
+        first_seen = datetime.now().isoformat(timespec='seconds')
+        with self.lock:
+            self.conn.executemany('INSERT OR IGNORE INTO crawl_seen VALUES (?, ?, ?)',
+                                  [(query, url, first_seen) for url in urls])
+            self.conn.commit()
+    
+    def count(self, table):
+        with self.lock:
+            return self.conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+    
+    def known_descriptions(self):
+        """URL -> description for every stored job whose detail page was already fetched"""
+        with self.lock:
+            return dict(self.conn.execute(
+                "SELECT \"URL\", \"Description\" FROM jobs "
+                "WHERE \"URL\" IS NOT NULL AND \"Description\" IS NOT NULL AND \"Description\" != 'N/A'"))
+    
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+# 0d. Keyword Scoring
+class TermIndex:
+    """
+    Binary document-term matrix over a jobs frame. Built once per version of the
+    store, it turns re-ranking against a new keyword set into a sparse column sum.
+    """
+    def __init__(self, jobs_df):
+        from sklearn.feature_extraction.text import CountVectorizer
+        self.text = (jobs_df['Title'].fillna('') + ' ' + jobs_df['Description'].fillna('')).str.lower()
+        self.vectorizer = CountVectorizer(binary=True, lowercase=False, token_pattern=r'(?u)\b\w+\b', dtype=np.int32)
+        if len(self.text):
+            self.matrix = self.vectorizer.fit_transform(self.text).tocsc()
+            self.vocabulary = self.vectorizer.vocabulary_
+        else:
+            self.matrix, self.vocabulary = None, {}
+
+
+class KeywordScorer:
+    """
+    Scores jobs by which keywords appear in their title and description.
+    All keywords are compiled into one alternation regex so a whole jobs frame is
+    scored in a single vectorized pass; keywords can carry weights and by default
+    only match whole words (so "IT" no longer matches inside "security").
+    """
+    def __init__(self, keywords, whole_word=True):
+        # Accept "a b c", ["a", "b"], or {"keyword or phrase": weight}
+        if isinstance(keywords, str):
+            keywords = keywords.split()
+        if not isinstance(keywords, dict):
+            keywords = {keyword: 1 for keyword in keywords}
+        self.weights = {keyword.lower(): weight for keyword, weight in keywords.items() if keyword.strip()}
+        self.whole_word = whole_word
+        
+        # Longest alternatives first so phrases win over the words inside them;
+        # the lookahead lets matches that start at different positions overlap
+        alternation = '|'.join(re.escape(keyword) for keyword in sorted(self.weights, key=len, reverse=True))
+        if whole_word:
+            alternation = rf'(?<!\w)(?:{alternation})(?!\w)'
+        self.pattern = re.compile(f'(?=({alternation}))') if self.weights else None
+        self.key = (tuple(sorted(self.weights.items())), whole_word)
+    
+    def score_text(self, text):
+        """Score a single piece of text (used while rows stream in from the scrapers)"""
+        if self.pattern is None:
+            return 0
+        return sum(self.weights[match] for match in set(self.pattern.findall(text.lower())))
+    
+    def score(self, jobs_df, term_index=None):
+        """
+        Score every row of a jobs frame at once, returning a Series aligned with its index.
+        With a TermIndex built from the same frame, single-word keywords are looked up
+        as sparse matrix columns and only phrases still need a regex pass.
+        """
+        if self.pattern is None or jobs_df.empty:
+            return pd.Series(0, index=jobs_df.index, name='Keywords_Match')
+        if term_index is None or not self.whole_word:
+            text = (jobs_df['Title'].fillna('') + ' ' + jobs_df['Description'].fillna('')).str.lower()
+            matches = text.str.findall(self.pattern).explode().dropna()
+            # Each keyword counts once per job, however many times it appears
+            hits = pd.DataFrame({'row': matches.index, 'keyword': matches.values}).drop_duplicates()
+            scores = hits['keyword'].map(self.weights).groupby(hits['row']).sum()
+            return scores.reindex(jobs_df.index, fill_value=0).rename('Keywords_Match')
+        
+        scores = np.zeros(len(jobs_df))
+        words = [keyword for keyword in self.weights if re.fullmatch(r'\w+', keyword)]
+        columns = [term_index.vocabulary[word] for word in words if word in term_index.vocabulary]
+        if columns:
+            weights = np.array([self.weights[word] for word in words if word in term_index.vocabulary], dtype=float)
+            scores += term_index.matrix[:, columns] @ weights
+        for phrase in set(self.weights) - set(words):
+            # Only rows containing every word of the phrase can match it, so regex just those
+            candidates = np.ones(len(jobs_df), dtype=bool)
+            for word in re.findall(r'\w+', phrase):
+                if word not in term_index.vocabulary:
+                    candidates[:] = False
+                    break
+                candidates &= term_index.matrix[:, term_index.vocabulary[word]].toarray().ravel() > 0
+            rows = np.flatnonzero(candidates)
+            if len(rows):
+                pattern = re.compile(rf'(?<!\w){re.escape(phrase)}(?!\w)')
+                scores[rows] += term_index.text.iloc[rows].str.contains(pattern).to_numpy() * self.weights[phrase]
+        
+        if all(isinstance(weight, int) for weight in self.weights.values()):
+            scores = scores.astype(int)
+        return pd.Series(scores, index=jobs_df.index, name='Keywords_Match')
+
+class RelevanceIndex:
+    """
+    BM25 relevance index over every stored job description. Terms are hashed, so
+    postings are appended incrementally without refitting a vocabulary, and the
+    raw term frequencies are kept in one sparse matrix. A top-k query against a
+    resume or any free-text profile is a single sparse matrix-vector product over
+    the query's term columns followed by an argpartition.
+    """
+    def __init__(self, n_features=2 ** 20, k1=1.5, b=0.75):
+        from sklearn.feature_extraction.text import HashingVectorizer
+        self.vectorizer = HashingVectorizer(analyzer=tokenize, n_features=n_features,
+                                            alternate_sign=False, norm=None, dtype=np.float32)
+        self.k1 = k1
+        self.b = b
+        self.doc_ids = np.zeros(0, dtype=np.int64)
+        self.doc_lengths = np.zeros(0, dtype=np.float32)
+        self.doc_freq = np.zeros(n_features, dtype=np.int32)
+        self.blocks = []
+        self.matrix = None
+        # Row of each store id and a checksum of the text it was indexed with; replaced rows are dead
+        self.rows = {}
+        self.checksums = {}
+        self.live = np.zeros(0, dtype=bool)
+        self.revision = -1
+        self.lock = threading.Lock()
+    
+    def add(self, doc_ids, texts):
+        """Index documents (store ids plus their text); a document already indexed with other text is replaced"""
+        checksums = [zlib.crc32(text.encode('utf-8')) for text in texts]
+        changed = [(doc_id, text, checksum) for doc_id, text, checksum in zip(doc_ids, texts, checksums)
+                   if self.checksums.get(doc_id) != checksum]
+        if not changed:
+            return 0
+        doc_ids, texts, checksums = zip(*changed)
+        import scipy.sparse as sparse
+        term_freqs = self.vectorizer.transform(texts).tocsr()
+        with self.lock:
+            replaced = [self.rows[doc_id] for doc_id in doc_ids if doc_id in self.rows]
+            if replaced:
+                # Take the old versions' terms back out of the document frequencies
+                merged = sparse.vstack(self.blocks).tocsr()
+                self.blocks = [merged]
+                self.doc_freq -= np.bincount(merged[replaced].indices, minlength=len(self.doc_freq)).astype(np.int32)
+                self.live[replaced] = False
+                self.doc_lengths[replaced] = 0
+            start = len(self.doc_ids)
+            self.blocks.append(term_freqs)
+            self.doc_ids = np.concatenate([self.doc_ids, np.asarray(doc_ids, dtype=np.int64)])
+            self.doc_lengths = np.concatenate([self.doc_lengths, np.asarray(term_freqs.sum(axis=1)).ravel()])
+            self.live = np.concatenate([self.live, np.ones(len(doc_ids), dtype=bool)])
+            self.doc_freq += np.bincount(term_freqs.indices, minlength=len(self.doc_freq)).astype(np.int32)
+            self.rows.update((doc_id, start + row) for row, doc_id in enumerate(doc_ids))
+            self.checksums.update(zip(doc_ids, checksums))
+            self.matrix = None
+        return len(doc_ids)
+    
+    def sync(self, store):
+        """Index the postings added to, or whose text changed in, the store since the last sync"""
+        rows = store.rows_since(self.revision)
+        if not rows:
+            return 0
+        indexed = self.add([row[0] for row in rows], [f"{row[2] or ''} {row[3] or ''}" for row in rows])
+        self.revision = rows[-1][1]
+        return indexed
+    
+    def _term_matrix(self):
+        import scipy.sparse as sparse
+        with self.lock:
+            if self.matrix is None:
+                # Column slices are what queries need, so keep the merged matrix in CSC form
+                self.matrix = sparse.vstack(self.blocks).tocsc() if self.blocks else None
+                self.blocks = [self.matrix.tocsr()] if self.matrix is not None else []
+            return self.matrix
+    
+    def search(self, profile_text, top_k=50):
+        """Return (store ids, BM25 scores) of the top_k postings for a free-text profile"""
+        import scipy.sparse as sparse
+        matrix = self._term_matrix()
+        if matrix is None:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        query = self.vectorizer.transform([profile_text]).tocsr()
+        columns, query_tf = query.indices, query.data
+        if not len(columns):
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        
+        n_docs = int(self.live.sum())
+        doc_freq = self.doc_freq[columns]
+        idf = np.log(1 + (n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+        
+        # BM25 term saturation only for the query's columns, then one product with the query weights
+        sub = matrix[:, columns]
+        tf = sub.data
+        average_length = self.doc_lengths.sum() / max(n_docs, 1)
+        norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[sub.indices] / max(average_length, 1e-9))
+        weighted = sparse.csc_matrix((tf * (self.k1 + 1) / (tf + norm), sub.indices, sub.indptr), shape=sub.shape)
+        scores = weighted @ (idf * query_tf)
+        # Rows replaced by a newer version of their posting never match
+        scores[~self.live] = 0
+        
+        top_k = min(top_k, len(self.doc_ids))
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+        top = top[scores[top] > 0]
+        return self.doc_ids[top], scores[top]
+
+# 0e. Near-duplicate Detection
+class _TokenHashes(dict):
+    """Token -> stable 32-bit hash, computed once per distinct token"""
+    def __missing__(self, token):
+        value = self[token] = zlib.crc32(token.encode('utf-8'))
+        return value
+
+
+class DuplicateIndex:
+    """
+    MinHash/LSH index that folds the same posting seen on several sources or
+    locations into one cluster. Each posting's normalized title, company and
+    description are cut into word shingles and reduced to a MinHash signature;
+    LSH banding puts likely duplicates in a shared bucket, so a new posting is only
+    compared with its bucket mates. Postings whose estimated Jaccard similarity
+    reaches the threshold are merged, and each cluster keeps one canonical row:
+    the one with the longest description, then the earliest stored.
+    """
+    def __init__(self, num_perm=64, bands=16, threshold=0.7, shingle_size=3, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(0, 1 << 63, num_perm, dtype=np.int64).astype(np.uint64) | np.uint64(1)
+        self.b = rng.randint(0, 1 << 63, num_perm, dtype=np.int64).astype(np.uint64)
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.band_weights = rng.randint(1, 1 << 62, self.rows_per_band, dtype=np.int64).astype(np.uint64)
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.token_hashes = _TokenHashes()
+        
+        self.signatures = np.zeros((0, num_perm), dtype=np.uint64)
+        self.size = 0
+        self.doc_ids = []
+        self.weights = []
+        self.parent = []
+        self.canonical = {}
+        self.buckets = [{} for _ in range(bands)]
+        # Band keys of each position, its near-duplicate links and the members of every multi-posting
+        # cluster, so a posting whose text changes can be taken out of its cluster on its own
+        self.keys = []
+        self.links = {}
+        self.members = {}
+        # Position of each store id and a checksum of the text its signature was computed from
+        self.positions = {}
+        self.checksums = {}
+        self.revision = -1
+        self._duplicates = None
+        self.lock = threading.Lock()
+    
+    def _shingles(self, texts):
+        """Hashed word shingles of every text, plus the offset where each text's shingles start"""
+        k = self.shingle_size
+        hashes = []
+        lengths = []
+        for text in texts:
+            tokens = list(map(self.token_hashes.__getitem__, Tokenizer.TOKEN_PATTERN.findall(text.lower())))
+            if len(tokens) < k:
+                tokens += [0] * (k - len(tokens))
+            hashes.extend(tokens)
+            lengths.append(len(tokens))
+        
+        # Shingle i of a text combines tokens i..i+k-1; windows that would cross into the next text are dropped
+        tokens = np.array(hashes, dtype=np.uint64)
+        ends = np.cumsum(lengths)
+        starts = ends - np.asarray(lengths) - np.arange(len(lengths)) * (k - 1)
+        valid = np.ones(len(tokens), dtype=bool)
+        for offset in range(1, k):
+            valid[ends - offset] = False
+        combined = np.zeros(len(tokens) - k + 1, dtype=np.uint64)
+        for offset in range(k):
+            combined = combined * np.uint64(0x100000001B3) + tokens[offset:len(tokens) - k + 1 + offset]
+        return combined[valid[:len(combined)]] >> np.uint64(32), starts
+    
+    def signatures_for(self, texts, chunk_size=10000):
+        """MinHash signatures (one row per text)"""
+        signatures = np.empty((len(texts), len(self.a)), dtype=np.uint64)
+        for chunk in range(0, len(texts), chunk_size):
+            shingles, starts = self._shingles(texts[chunk:chunk + chunk_size])
+            for perm, (a, b) in enumerate(zip(self.a, self.b)):
+                # Multiply-shift hashing: one permutation of the 32-bit shingle space per (a, b)
+                values = (shingles * a + b) >> np.uint64(32)
+                signatures[chunk:chunk + len(starts), perm] = np.minimum.reduceat(values, starts)
+        return signatures
+    
+    def _find(self, position):
+        parent = self.parent
+        root = position
+        while parent[root] != root:
+            root = parent[root]
+        while parent[position] != root:
+            parent[position], position = root, parent[position]
+        return root
+    
+    def _union(self, left, right):
+        left, right = self._find(left), self._find(right)
+        if left == right:
+            return
+        # The larger original index joins the smaller so roots stay stable
+        if right < left:
+            left, right = right, left
+        self.parent[right] = left
+        self.members.setdefault(left, [left]).extend(self.members.pop(right, [right]))
+        best = [self.canonical.pop(right, right), self.canonical.get(left, left)]
+        self.canonical[left] = min(best, key=self._rank)
+    
+    def _rank(self, position):
+        return -self.weights[position], self.doc_ids[position]
+    
+    def _band_keys(self, signatures):
+        return [
+            (signatures[:, band * self.rows_per_band:(band + 1) * self.rows_per_band] * self.band_weights)
+            .sum(axis=1).tolist()
+            for band in range(self.bands)
+        ]
+    
+    def _link(self, position, keys):
+        """Bucket one position and merge it into any cluster it near-duplicates"""
+        self.keys[position] = keys
+        candidates = set()
+        for key, buckets in zip(keys, self.buckets):
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = [position]
+            else:
+                candidates.update(bucket)
+                bucket.append(position)
+        if candidates:
+            candidates = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+            similarity = (self.signatures[candidates] == self.signatures[position]).mean(axis=1)
+            for other in candidates[similarity >= self.threshold]:
+                other = int(other)
+                self.links.setdefault(position, set()).add(other)
+                self.links.setdefault(other, set()).add(position)
+                self._union(position, other)
+    
+    def _unlink(self, position):
+        """
+        Take one position out of its buckets and links, and split what is left of its
+        cluster into the groups that are still linked; other clusters are untouched
+        """
+        for key, buckets in zip(self.keys[position], self.buckets):
+            bucket = buckets[key]
+            bucket.remove(position)
+            if not bucket:
+                del buckets[key]
+        for other in self.links.pop(position, ()):
+            self.links[other].discard(position)
+            if not self.links[other]:
+                del self.links[other]
+        root = self._find(position)
+        remaining = set(self.members.pop(root, [root]))
+        self.canonical.pop(root, None)
+        while remaining:
+            # Each group still connected by links becomes a cluster rooted at its smallest position
+            group = []
+            frontier = [remaining.pop()]
+            while frontier:
+                member = frontier.pop()
+                group.append(member)
+                for other in self.links.get(member, ()):
+                    if other in remaining:
+                        remaining.discard(other)
+                        frontier.append(other)
+            group_root = min(group)
+            for member in group:
+                self.parent[member] = group_root
+            if len(group) > 1:
+                self.members[group_root] = group
+                self.canonical[group_root] = min(group, key=self._rank)
+    
+    def add(self, doc_ids, texts, weights):
+        """
+        Index postings and merge each into any cluster it near-duplicates. A posting already
+        indexed with other text is unlinked from its cluster and linked again with its new signature.
+        """
+        checksums = [zlib.crc32(text.encode('utf-8')) for text in texts]
+        changed = [(int(doc_id), text, weight, checksum)
+                   for doc_id, text, weight, checksum in zip(doc_ids, texts, weights, checksums)
+                   if self.checksums.get(int(doc_id)) != checksum]
+        if not changed:
+            return 0
+        signatures = self.signatures_for([text for _, text, _, _ in changed])
+        row_keys = list(zip(*self._band_keys(signatures)))
+        with self.lock:
+            start = self.size
+            new = [row for row, (doc_id, _, _, _) in enumerate(changed) if doc_id not in self.positions]
+            if start + len(new) > len(self.signatures):
+                grown = np.zeros((max(2 * len(self.signatures), start + len(new)), signatures.shape[1]), dtype=np.uint64)
+                grown[:start] = self.signatures[:start]
+                self.signatures = grown
+            for row, (doc_id, _, weight, _) in enumerate(changed):
+                position = self.positions.get(doc_id)
+                if position is None:
+                    position = self.positions[doc_id] = self.size
+                    self.size += 1
+                    self.doc_ids.append(doc_id)
+                    self.weights.append(weight)
+                    self.parent.append(position)
+                    self.keys.append(None)
+                else:
+                    self._unlink(position)
+                    self.weights[position] = weight
+                self.signatures[position] = signatures[row]
+                self._link(position, row_keys[row])
+            self.checksums.update((doc_id, checksum) for doc_id, _, _, checksum in changed)
+            self._duplicates = None
+        return len(changed)
+    
+    def sync(self, store):
+        """Index the postings added to, or whose text changed in, the store since the last sync"""
+        rows = store.rows_since(self.revision, ('Title', 'Company', 'Description'))
+        if not rows:
+            return 0
+        descriptions = [row[4] if row[4] and row[4] != "N/A" else "" for row in rows]
+        indexed = self.add([row[0] for row in rows],
+                           [f"{row[2] or ''} {row[3] or ''} {description}" for row, description in zip(rows, descriptions)],
+                           [len(description) for description in descriptions])
+        self.revision = rows[-1][1]
+        return indexed
+    
+    def duplicate_ids(self):
+        """Store ids of every posting that is not its cluster's canonical row"""
+        with self.lock:
+            if self._duplicates is None:
+                canonical = {self.canonical.get(root, root) for root in map(self._find, range(self.size))}
+                self._duplicates = np.array([doc_id for position, doc_id in enumerate(self.doc_ids)
+                                             if position not in canonical], dtype=np.int64)
+            return self._duplicates
+    
+    def clusters(self):
+        """{canonical store id: [store ids of its duplicates]} for every cluster with more than one posting"""
+        with self.lock:
+            members = {}
+            for position in range(self.size):
+                members.setdefault(self._find(position), []).append(position)
+            return {
+                self.doc_ids[self.canonical.get(root, root)]:
+                    [self.doc_ids[p] for p in positions if p != self.canonical.get(root, root)]
+                for root, positions in members.items() if len(positions) > 1
             }
-            
+
+# 0f. Metrics
+class _NullTimer:
+    """Reusable no-op context manager handed out when metrics are disabled"""
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+
+
+class _Timer:
+    __slots__ = ('metrics', 'name', 'start')
+    
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc):
+        self.metrics.timing(self.name, (time.perf_counter() - self.start) * 1000)
+        return False
+
+
+class NullMetrics:
+    """Metrics backend that records nothing; the default until configure_metrics() enables StatsD"""
+    enabled = False
+    _null_timer = _NullTimer()
+    
+    def incr(self, name, value=1):
+        pass
+    
+    def timing(self, name, milliseconds):
+        pass
+    
+    def gauge(self, name, value):
+        pass
+    
+    def timer(self, name):
+        return self._null_timer
+    
+    def flush(self):
+        pass
+    
+    def close(self):
+        pass
+
+
+class StatsdMetrics(NullMetrics):
+    """
+    StatsD client for per-stage latency and pipeline counters. Recording only
+    updates in-memory aggregates under a lock; a background thread sends them
+    every flush_interval seconds as batched UDP packets on a non-blocking socket,
+    so a slow or missing collector never stalls the pipeline (packets are dropped).
+    Counters are summed between flushes; every timing sample is sent (as |ms) so
+    Telegraf can build the latency percentiles and histograms.
+    """
+    enabled = True
+    
+    def __init__(self, host='localhost', port=8125, prefix='job_app', flush_interval=1.0, max_packet=1432):
+        import socket
+        self.address = (host, port)
+        self.prefix = prefix + '.' if prefix else ''
+        self.flush_interval = flush_interval
+        self.max_packet = max_packet
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+        self.stats = {'packets': 0, 'dropped': 0}
+        self.closed = False
+        self._reset()
+        # A forked document worker gets fresh buffers and its own flusher
+        os.register_at_fork(after_in_child=self._after_fork)
+    
+    def _after_fork(self):
+        if not self.closed:
+            self._reset()
+    
+    def _reset(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.timings = {}
+        self.gauges = {}
+        self._stopped = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name='statsd-flush', daemon=True)
+        self._flusher.start()
+    
+    def incr(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+    
+    def timing(self, name, milliseconds):
+        with self.lock:
+            samples = self.timings.get(name)
+            if samples is None:
+                self.timings[name] = [milliseconds]
+            else:
+                samples.append(milliseconds)
+    
+    def gauge(self, name, value):
+        with self.lock:
+            self.gauges[name] = value
+    
+    def timer(self, name):
+        return _Timer(self, name)
+    
+    def _flush_loop(self):
+        while not self._stopped.wait(self.flush_interval):
+            self.flush()
+    
+    def _lines(self):
+        with self.lock:
+            counters, self.counters = self.counters, {}
+            timings, self.timings = self.timings, {}
+            gauges, self.gauges = self.gauges, {}
+        prefix = self.prefix
+        for name, value in counters.items():
+            if value:
+                yield f"{prefix}{name}:{value}|c"
+        for name, samples in timings.items():
+            for milliseconds in samples:
+                yield f"{prefix}{name}:{milliseconds:.3f}|ms"
+        for name, value in gauges.items():
+            yield f"{prefix}{name}:{value}|g"
+    
+    def flush(self):
+        """Send everything recorded since the last flush, packed into as few packets as fit"""
+        packet = []
+        size = 0
+        for line in self._lines():
+            if packet and size + len(line) + 1 > self.max_packet:
+                self._send('\n'.join(packet))
+                packet, size = [], 0
+            packet.append(line)
+            size += len(line) + 1
+        if packet:
+            self._send('\n'.join(packet))
+    
+    def _send(self, payload):
+        try:
+            self.socket.sendto(payload.encode('ascii'), self.address)
+            self.stats['packets'] += 1
+        except OSError:
+            self.stats['dropped'] += 1
+    
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self._stopped.set()
+        self.flush()
+        self.socket.close()
+
+
+metrics = NullMetrics()
+
+
+def configure_metrics(host=None, port=None, prefix='job_app', enabled=True, flush_interval=1.0):
+    """
+    Point the pipeline's metrics at a StatsD collector such as the f(log) Telegraf
+    service. host and port default to TELEGRAF_HOST / STATSD_PORT from the environment
+    (port 8125); with no host, or enabled=False, metrics stay a no-op.
+    """
+    global metrics
+    metrics.close()
+    host = host or os.environ.get('TELEGRAF_HOST')
+    if enabled and host:
+        port = port or int(os.environ.get('STATSD_PORT', 8125))
+        metrics = StatsdMetrics(host, port, prefix, flush_interval)
+        print(f"Sending pipeline metrics to StatsD at {host}:{port}")
+    else:
+        metrics = NullMetrics()
+    return metrics
+
+
+def timed(stage):
+    """Decorator recording a call's latency as stage.<stage> on the current metrics backend"""
+    name = 'stage.' + stage
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with metrics.timer(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# 0g. Output and Drive Sync
+class OutputSync:
+    """
+    Local-first output. Documents and CSV exports are written to fast local scratch
+    (local_dir) and registered in a manifest with their size and SHA-1; a background
+    thread copies new or changed files to drive_dir in bulk once writes have been
+    quiet for `interval` seconds. With archive=True nothing is copied file by file:
+    each batch is packed into one zip and copied on sync(). Files whose content
+    matches what was last synced are skipped. Without a mounted drive_dir (e.g.
+    outside Colab) output simply stays in local_dir.
+    """
+    MANIFEST = 'manifest.json'
+    
+    def __init__(self, local_dir=None, drive_dir=None, archive=False, interval=5.0):
+        self.local_dir = os.path.abspath(local_dir or OUTPUT_DIR)
+        drive_dir = DRIVE_DIR if drive_dir is None else drive_dir
+        self.drive_dir = drive_dir if drive_dir and os.path.isdir(drive_dir) else None
+        self.archive = archive
+        self.interval = interval
+        os.makedirs(self.local_dir, exist_ok=True)
+    
+        self.lock = threading.Lock()
+        self.sync_lock = threading.Lock()
+        self.manifest = self._load_manifest()
+        self.archive_name = None
+        self.stats = {'written': 0, 'unchanged': 0, 'copied': 0, 'archives': 0, 'failed': 0}
+        # Forked document workers share this object but only write files; the owner registers and syncs
+        self._owner = os.getpid()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = None
+    
+    def _load_manifest(self):
+        try:
+            with open(os.path.join(self.local_dir, self.MANIFEST), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_manifest(self):
+        path = os.path.join(self.local_dir, self.MANIFEST)
+        with self.lock:
+            snapshot = json.dumps(self.manifest, indent=1)
+        # Scratch may have been wiped (a new Colab runtime) while Drive still holds the synced copies
+        os.makedirs(self.local_dir, exist_ok=True)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            f.write(snapshot)
+        os.replace(path + '.tmp', path)
+    
+    def path(self, filename):
+        """Local path to write an output file to (filename may include subfolders)"""
+        path = os.path.join(self.local_dir, filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+    
+    def _name(self, path):
+        return os.path.relpath(os.path.abspath(path), self.local_dir)
+    
+    def add(self, *paths):
+        """Register freshly written files; changed ones are synced in the background"""
+        if os.getpid() != self._owner:
+            return
+        for path in paths:
+            if not path or not os.path.exists(path):
+                continue
+            digest = hashlib.sha1()
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+            with self.lock:
+                entry = self.manifest.setdefault(self._name(path), {})
+                entry.update(size=os.path.getsize(path), sha1=digest.hexdigest(),
+                             written=datetime.now().isoformat(timespec='seconds'))
+                self.stats['unchanged' if entry.get('synced') == entry['sha1'] else 'written'] += 1
+        if not self.archive:
+            self._schedule()
+    
+    def pending(self):
+        """Names of registered files whose current content has not reached Drive yet"""
+        with self.lock:
+            return [name for name, entry in self.manifest.items() if entry.get('synced') != entry['sha1']]
+    
+    def destination(self, path):
+        """Where a local output file ends up on Drive (inside the batch archive with archive=True)"""
+        if not self.drive_dir:
+            return path
+        if self.archive:
+            return os.path.join(self.drive_dir, self.archive_name or self.begin_batch(), self._name(path))
+        return os.path.join(self.drive_dir, self._name(path))
+    
+    def exists(self, path):
+        """True while a file is in local scratch, or once its synced copy is on Drive"""
+        if os.path.exists(path):
+            return True
+        return bool(self.drive_dir) and not self.archive and os.path.exists(self.destination(path))
+    
+    def begin_batch(self, name=None):
+        """Start a new batch; with archive=True its files sync into one zip named after it"""
+        self.archive_name = name or f"Applications_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+        return self.archive_name
+    
+    def _schedule(self):
+        if not self.drive_dir:
+            return
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._sync_loop, name='drive-sync', daemon=True)
+            self._thread.start()
+        self._wake.set()
+    
+    def _sync_loop(self):
+        while not self._stopped:
+            self._wake.wait()
+            # Let a burst of writes settle so they go out together
+            while self._wake.is_set() and not self._stopped:
+                self._wake.clear()
+                time.sleep(self.interval)
+            if not self._stopped:
+                self._sync()
+    
+    def sync(self, wait=True):
+        """Push pending files to Drive now, or with wait=False on a background thread"""
+        if not self.drive_dir:
+            return 0
+        archive_name = (self.archive_name or self.begin_batch()) if self.archive else None
+        if not wait:
+            threading.Thread(target=self._sync, args=(archive_name,), name='drive-sync-now', daemon=True).start()
+            return None
+        return self._sync(archive_name)
+    
+    def _sync(self, archive_name=None):
+        if not self.drive_dir:
+            return 0
+        with self.sync_lock:
+            names = self.pending()
+            if not names:
+                return 0
             try:
-                response = requests.get(base_url, params=params, headers=headers)
-                soup = BeautifulSoup(response.text, 'html.parser')
+                if self.archive:
+                    self._sync_archive(names, archive_name or self.archive_name or self.begin_batch())
+                else:
+                    self._sync_files(names)
+            finally:
+                self._save_manifest()
+            return len(names)
+    
+    def _sync_files(self, names):
+        started = time.perf_counter()
+        copied = self.stats['copied']
+        for name in names:
+            target = os.path.join(self.drive_dir, name)
+            with self.lock:
+                digest = self.manifest[name]['sha1']
+            try:
+                # Copy then rename, so Drive never holds a half-written file
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.copyfile(os.path.join(self.local_dir, name), target + '.partial')
+                os.replace(target + '.partial', target)
+            except OSError as e:
+                self.stats['failed'] += 1
+                print(f"Drive sync failed for {name}: {str(e)}")
+                continue
+            self.stats['copied'] += 1
+            with self.lock:
+                self.manifest[name]['synced'] = digest
+        metrics.timing('stage.drive_sync', (time.perf_counter() - started) * 1000)
+        metrics.incr('documents.synced', self.stats['copied'] - copied)
+    
+    def _sync_archive(self, names, archive_name):
+        import zipfile
+        started = time.perf_counter()
+        local_archive = os.path.join(self.local_dir, archive_name)
+        target = os.path.join(self.drive_dir, archive_name)
+        # A later sync of the same batch rewrites its archive with everything synced into it so far
+        with self.lock:
+            members = sorted(set(names) | {name for name, entry in self.manifest.items()
+                                           if entry.get('archive') == archive_name})
+            digests = {name: self.manifest[name]['sha1'] for name in names}
+        try:
+            # Documents are already compressed (docx) or small, so members are stored as-is
+            with zipfile.ZipFile(local_archive, 'w', zipfile.ZIP_STORED) as archive:
+                for name in members:
+                    archive.write(os.path.join(self.local_dir, name), name)
+            shutil.copyfile(local_archive, target + '.partial')
+            os.replace(target + '.partial', target)
+        except OSError as e:
+            self.stats['failed'] += 1
+            print(f"Drive sync failed for {archive_name}: {str(e)}")
+            return
+        finally:
+            if os.path.exists(local_archive):
+                os.remove(local_archive)
+        self.stats['archives'] += 1
+        with self.lock:
+            for name, digest in digests.items():
+                self.manifest[name].update(synced=digest, archive=archive_name)
+        metrics.timing('stage.drive_sync', (time.perf_counter() - started) * 1000)
+        metrics.incr('documents.synced', len(names))
+        print(f"Synced {len(names)} files to {target}")
+    
+    def close(self):
+        """Stop the background thread and do a final blocking sync"""
+        self._stopped = True
+        self._wake.set()
+        synced = self.sync()
+        self._save_manifest()
+        return synced
+
+
+_output = None
+
+
+def get_output():
+    """The shared OutputSync, created on first use from OUTPUT_DIR and DRIVE_DIR"""
+    global _output
+    if _output is None:
+        _output = OutputSync()
+    return _output
+
+
+def configure_output(local_dir=None, drive_dir=None, archive=False, interval=5.0):
+    """
+    Choose where output is written and synced. local_dir and drive_dir default to
+    OUTPUT_DIR / DRIVE_DIR (JOB_APP_OUTPUT_DIR / JOB_APP_DRIVE_DIR in the environment);
+    archive=True syncs each batch to Drive as a single zip.
+    """
+    global _output
+    if _output is not None:
+        _output.close()
+    _output = OutputSync(local_dir, drive_dir, archive, interval)
+    return _output
+
+# 1. Job Retrieval Component
+class JobRetriever:
+    def __init__(self, fetcher=None, base_urls=None, cache=None, parser=None, store=None, dedupe=True,
+                 incremental=False):
+        """
+        Optionally pass a shared FetchEngine, base_urls to point sources at
+        another host (e.g. a local stand-in server for testing), a ResponseCache,
+        a parser backend name ('selectolax', 'lxml' or 'html.parser') and a JobStore.
+        With dedupe, near-duplicate postings are folded to one canonical row when filtering.
+        With incremental, searches page newest-first and stop once a page holds nothing new.
+        """
+        self.store = store or JobStore()
+        self.scorer = None
+        self.scorers = {}
+        self._scores = None
+        self._term_index = None
+        self.relevance_index = None
+        self.dedupe = dedupe
+        self.duplicate_index = None
+        self._deduped = 0
+        self.fetcher = fetcher or FetchEngine()
+        self.parser = get_card_parser(parser)
+        if cache is not None:
+            self.fetcher.cache = cache
+        self.detail_stats = {}
+        self.incremental = incremental
+        self.crawl_stats = {}
+        # URLs each (source, keywords, location) query of the last search returned, for routing
+        self.query_hits = {}
+        self.base_urls = {name: source['base_url'] for name, source in JOB_SOURCES.items()}
+        self.base_urls.update(base_urls or {})
+    
+    def _page_params(self, source, keywords, location, page, newest_first=False):
+        start = page * JOB_SOURCES[source]['page_size']
+        keywords = query_text(source, keywords)
+        if source == 'indeed':
+            params = {'q': keywords, 'l': location, 'start': start}
+            if newest_first:
+                params['sort'] = 'date'
+            return params
+        params = {'keywords': keywords, 'location': location, 'start': start}
+        if newest_first:
+            params['sortBy'] = 'DD'
+        return params
+    
+    def _page_request(self, source, keywords, location, page, pages, query_key=None):
+        return {
+            'url': self.base_urls[source],
+            'params': self._page_params(source, keywords, location, page, newest_first=query_key is not None),
+            'source': source,
+            'keywords': keywords,
+            'location': location,
+            'page': page,
+            'pages': pages,
+            'query_key': query_key,
+        }
+    
+    @staticmethod
+    def query_key(source, keywords, location):
+        """Normalized identity of a standing search, under which its seen URLs are kept"""
+        return '|'.join((source, ' '.join(query_text(source, keywords).lower().split()), ' '.join(location.lower().split())))
+    
+    @timed('search')
+    def search(self, queries, incremental=None):
+        """
+        Run many (source, keywords, location[, pages]) searches in one concurrent sweep.
+        Every page across every query is fetched through the shared FetchEngine, then parsed.
+        In incremental mode (default: the retriever's setting) each query is paged newest-first,
+        one page at a time, and stops at the first page holding no URL it has returned before;
+        pages is then an upper bound.
+        """
+        incremental = self.incremental if incremental is None else incremental
+        # With a single keyword set, filter_jobs re-ranks against it by default
+        keyword_sets = {query[1] for query in queries}
+        if len(keyword_sets) == 1:
+            self.scorer = self._get_scorer(keyword_sets.pop())
+        
+        page_requests = []
+        seen = {}
+        self.query_hits = {}
+        for query in queries:
+            source, keywords, location = query[:3]
+            pages = query[3] if len(query) > 3 else JOB_SOURCES[source]['pages']
+            print(f"Searching {source.title()} for {query_text(source, keywords)} in {location}...")
+            if incremental:
+                # Only the first page goes out now; each further page depends on the one before
+                key = self.query_key(source, keywords, location)
+                if key not in seen:
+                    seen[key] = self.store.seen_urls(key)
+                    # What earlier runs of this standing search returned counts as found by it too
+                    self.query_hits[(source, keywords, location)] = set(seen[key])
+                    page_requests.append(self._page_request(source, keywords, location, 0, pages, key))
+            else:
+                page_requests.extend(self._page_request(source, keywords, location, page, pages)
+                                     for page in range(pages))
+        self.crawl_stats = {'pages': 0, 'budget': sum(req['pages'] for req in page_requests) if incremental else 0,
+                            'new': 0, 'seen': 0, 'stopped_early': 0}
+        
+        # LinkedIn cards only carry a link, so their descriptions are filled in by the detail pipeline
+        found = []
+        def add_rows(rows):
+            for job in rows:
+                scorer = self._get_scorer(job.pop('_keywords'))
+                job['Keywords_Match'] = scorer.score_text(job['Title'] + " " + job['Description'])
+            found.extend(rows)
+            self._add_jobs(rows)
+            metrics.incr('jobs.stored', len(rows))
+        detail_pipeline = DetailPipeline(self.fetcher, self._parse_linkedin_description, add_rows,
+                                         known_descriptions=self._known_descriptions())
+        
+        pending = {self.fetcher.submit(req['url'], req['params'], None, req['source']): req for req in page_requests}
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    req = pending.pop(future)
+                    source_name = 'LinkedIn' if req['source'] == 'linkedin' else 'Indeed'
+                    try:
+                        response = future.result()
+                        with metrics.timer('parse.' + req['source']):
+                            if req['source'] == 'indeed':
+                                rows = self._parse_indeed_page(response, req['keywords'])
+                            else:
+                                rows = self._parse_linkedin_page(response, req['keywords'])
+                        metrics.incr('cards.parsed', len(rows))
+                        self.query_hits.setdefault((req['source'], req['keywords'], req['location']), set()).update(
+                            row['URL'] for row in rows if row['URL'] != "N/A")
+                        next_req = self._advance_crawl(req, rows, seen[req['query_key']]) if incremental else None
+                        if req['source'] == 'indeed':
+                            add_rows(rows)
+                        else:
+                            for stub in rows:
+                                detail_pipeline.put(stub)
+                    except Exception as e:
+                        print(f"Error scraping {source_name} page {req['page']}: {str(e)}")
+                        continue
+                    if next_req:
+                        pending[self.fetcher.submit(next_req['url'], next_req['params'], None,
+                                                    next_req['source'])] = next_req
+        finally:
+            self.detail_stats = detail_pipeline.close()
+        
+        if incremental:
+            crawl = self.crawl_stats
+            metrics.incr('crawl.new', crawl['new'])
+            metrics.incr('crawl.pages_saved', crawl['budget'] - crawl['pages'])
+            print(f"Incremental crawl: {crawl['pages']} of {crawl['budget']} pages fetched, {crawl['new']} new postings, "
+                  f"{crawl['seen']} already seen, {crawl['stopped_early']} searches stopped early")
+        stats = self.detail_stats
+        if stats['queued'] or stats['reused']:
+            print(f"LinkedIn details: {stats['fetched']} fetched, {stats['reused']} reused, "
+                  f"{stats['duplicates']} duplicates, {stats['failed']} failed, {stats['retried']} retried")
+        if self.dedupe and found:
+            self._duplicate_ids()
+            print(f"Near-duplicates: {len(self.duplicate_index.duplicate_ids())} of "
+                  f"{self.duplicate_index.size} stored postings fold into another posting")
+        return len(found)
+    
+    def _advance_crawl(self, req, rows, seen):
+        """
+        Fold one page of an incremental search into its query's high-water mark and
+        return the request for the next page, or None once a page brings nothing new.
+        """
+        new = [row['URL'] for row in rows if row['URL'] != "N/A" and row['URL'] not in seen]
+        # Cards without a URL cannot be told apart, so they never count as new
+        new = list(dict.fromkeys(new))
+        seen.update(new)
+        self.store.mark_seen(req['query_key'], new)
+        self.crawl_stats['pages'] += 1
+        self.crawl_stats['new'] += len(new)
+        self.crawl_stats['seen'] += len(rows) - len(new)
+        if not new:
+            if req['page'] + 1 < req['pages']:
+                self.crawl_stats['stopped_early'] += 1
+            return None
+        if req['page'] + 1 >= req['pages']:
+            return None
+        return self._page_request(req['source'], req['keywords'], req['location'], req['page'] + 1,
+                                  req['pages'], req['query_key'])
+    
+    @property
+    def jobs_df(self):
+        """All stored jobs as a DataFrame, loaded lazily from the JobStore"""
+        return self.store.frame('jobs')
+    
+    def _add_jobs(self, rows):
+        """Upsert finished rows into the job store as they stream in"""
+        self.store.upsert('jobs', rows)
+    
+    def _known_descriptions(self):
+        return self.store.known_descriptions()
+    
+    def _get_scorer(self, keywords):
+        if keywords not in self.scorers:
+            # A merged query (a tuple of keyword sets) scores on all of their keywords
+            self.scorers[keywords] = KeywordScorer(' '.join(keywords) if isinstance(keywords, tuple) else keywords)
+        return self.scorers[keywords]
+    
+    def search_indeed(self, keywords, location, pages=5, incremental=None):
+        """
+        Scrape job listings from Indeed based on keywords and location
+        """
+        return self.search([('indeed', keywords, location, pages)], incremental)
+    
+    def _parse_indeed_page(self, response, keywords):
+        jobs = []
+        today = datetime.now()
+        for card in self.parser.parse_cards(response.text, 'indeed'):
+            if card['title'] and card['company']:
+                job_title = card['title']
+                company = card['company']
+                location = card['location'] or "N/A"
+                description = card['description'] or "N/A"
+                url = urljoin(response.url, card['href'] or '')
                 
-                job_cards = soup.find_all('div', class_='jobsearch-SerpJobCard')
+                job_data = {
+                    'Title': job_title,
+                    'Company': company,
+                    'Location': location,
+                    'Description': description,
+                    'URL': url,
+                    # The card's own date; without one, the day it was first seen (stored dates are never overwritten)
+                    'Date_Posted': posting_date(card['posted'], today) or today.strftime("%Y-%m-%d"),
+                    '_keywords': keywords
+                }
                 
-                for card in job_cards:
-                    job_title_elem = card.find('a', class_='jobtitle')
-                    company_elem = card.find('span', class_='company')
-                    location_elem = card.find('div', class_='recJobLoc')
-                    description_elem = card.find('div', class_='summary')
-                    
-                    if job_title_elem and company_elem:
-                        job_title = job_title_elem.text.strip()
-                        company = company_elem.text.strip()
-                        location = location_elem['data-rc-loc'] if location_elem else "N/A"
-                        description = description_elem.text.strip() if description_elem else "N/A"
-                        url = "https://www.indeed.com" + job_title_elem['href']
-                        
-                        # Calculate keyword match score
-                        keywords_list = keywords.lower().split()
-                        match_score = sum(1 for keyword in keywords_list if keyword.lower() in (job_title.lower() + " " + description.lower()))
-                        
-                        job_data = {
-                            'Title': job_title,
-                            'Company': company,
-                            'Location': location,
-                            'Description': description,
-                            'URL': url,
-                            'Date_Posted': datetime.now().strftime("%Y-%m-%d"),
-                            'Keywords_Match': match_score
-                        }
-                        
-                        all_jobs.append(job_data)
-            
-            except Exception as e:
-                print(f"Error scraping Indeed page {page}: {str(e)}")
-        
-        # Update the jobs dataframe
-        new_jobs_df = pd.DataFrame(all_jobs)
-        self.jobs_df = pd.concat([self.jobs_df, new_jobs_df], ignore_index=True)
+                jobs.append(job_data)
+        return jobs
     
-    def search_linkedin(self, keywords, location, pages=2):
+    def search_linkedin(self, keywords, location, pages=2, incremental=None):
         """
         Scrape job listings from LinkedIn based on keywords and location
         Note: LinkedIn has more restrictions, so this may require additional auth
         """
-        print(f"Searching LinkedIn for {keywords} in {location}...")
         # This is a simplified version; LinkedIn may require authentication
-        base_url = "https://www.linkedin.com/jobs/search"
-        
-        all_jobs = []
-        for page in range(pages):
-            params = {
-                'keywords': keywords,
-                'location': location,
-                'start': page * 25
-            }
-            
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            
-            try:
-                response = requests.get(base_url, params=params, headers=headers)
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                job_cards = soup.find_all('div', class_='base-card')
+        return self.search([('linkedin', keywords, location, pages)], incremental)
+    
+    def _parse_linkedin_page(self, response, keywords):
+        """Parse result cards into stubs; descriptions come later from the detail pipeline"""
+        jobs = []
+        today = datetime.now()
+        for card in self.parser.parse_cards(response.text, 'linkedin'):
+            if card['title'] and card['company']:
+                job_data = {
+                    'Title': card['title'],
+                    'Company': card['company'],
+                    'Location': card['location'] or "N/A",
+                    'Description': "N/A",
+                    'URL': card['href'] or "N/A",
+                    'Date_Posted': posting_date(card['posted'], today) or today.strftime("%Y-%m-%d"),
+                    '_keywords': keywords
+                }
                 
-                for card in job_cards:
-                    job_title_elem = card.find('h3', class_='base-search-card__title')
-                    company_elem = card.find('h4', class_='base-search-card__subtitle')
-                    location_elem = card.find('span', class_='job-search-card__location')
-                    link_elem = card.find('a', class_='base-card__full-link')
-                    
-                    if job_title_elem and company_elem:
-                        job_title = job_title_elem.text.strip()
-                        company = company_elem.text.strip()
-                        location = location_elem.text.strip() if location_elem else "N/A"
-                        url = link_elem['href'] if link_elem else "N/A"
-                        
-                        # Get full description by visiting the job URL
-                        description = "N/A"
-                        if url != "N/A":
-                            try:
-                                job_response = requests.get(url, headers=headers)
-                                job_soup = BeautifulSoup(job_response.text, 'html.parser')
-                                description_elem = job_soup.find('div', class_='description__text')
-                                if description_elem:
-                                    description = description_elem.text.strip()
-                            except:
-                                pass
-                        
-                        # Calculate keyword match score
-                        keywords_list = keywords.lower().split()
-                        match_score = sum(1 for keyword in keywords_list if keyword.lower() in (job_title.lower() + " " + description.lower()))
-                        
-                        job_data = {
-                            'Title': job_title,
-                            'Company': company,
-                            'Location': location,
-                            'Description': description,
-                            'URL': url,
-                            'Date_Posted': datetime.now().strftime("%Y-%m-%d"),
-                            'Keywords_Match': match_score
-                        }
-                        
-                        all_jobs.append(job_data)
-            
-            except Exception as e:
-                print(f"Error scraping LinkedIn page {page}: {str(e)}")
+                jobs.append(job_data)
+        return jobs
+    
+    def _parse_linkedin_description(self, response):
+        """Get the full description from a LinkedIn job page"""
+        return self.parser.parse_description(response.text) or "N/A"
+    
+    @timed('score_jobs')
+    def score_jobs(self, keywords=None, whole_word=True):
+        """
+        Return jobs_df with Keywords_Match recomputed in one batch, without re-scraping.
+        keywords may be a string, a list or a {keyword: weight} dict; by default the
+        keywords of the last search are used.
+        """
+        jobs_df = self.jobs_df
+        if keywords is None and self.scorer is None:
+            return jobs_df
+        scorer = self.scorer if keywords is None else KeywordScorer(keywords, whole_word)
         
-        # Update the jobs dataframe
-        new_jobs_df = pd.DataFrame(all_jobs)
-        self.jobs_df = pd.concat([self.jobs_df, new_jobs_df], ignore_index=True)
+        # The term index is rebuilt only when the store changes; scores also when the keywords do
+        if self._term_index is None or self._term_index[0] is not jobs_df:
+            self._term_index = (jobs_df, TermIndex(jobs_df))
+        if self._scores is None or self._scores[0] is not jobs_df or self._scores[1] != scorer.key:
+            scores = scorer.score(jobs_df, self._term_index[1])
+            self._scores = (jobs_df, scorer.key, jobs_df.assign(Keywords_Match=scores))
+        return self._scores[2]
+    
+    @timed('rank_jobs')
+    def rank_jobs(self, profile_text, top_k=50):
+        """
+        Top-k stored postings by BM25 relevance to a resume or free-text profile,
+        with a Relevance column. The index catches up with new postings on each call.
+        """
+        if self.relevance_index is None:
+            self.relevance_index = RelevanceIndex()
+        self.relevance_index.sync(self.store)
+        duplicates = self._duplicate_ids()
+        # Over-fetch by the number of duplicates so top_k canonical rows survive the dedup
+        doc_ids, scores = self.relevance_index.search(profile_text, top_k + len(duplicates))
+        ranked = self.score_jobs().loc[doc_ids].assign(Relevance=scores)
+        return ranked[~ranked.index.isin(duplicates)].head(top_k)
+    
+    def _duplicate_ids(self):
+        if not self.dedupe:
+            return np.zeros(0, dtype=np.int64)
+        if self.duplicate_index is None:
+            self.duplicate_index = DuplicateIndex()
+        with metrics.timer('stage.dedupe'):
+            self.duplicate_index.sync(self.store)
+            duplicates = self.duplicate_index.duplicate_ids()
+        if len(duplicates) > self._deduped:
+            metrics.incr('jobs.deduped', len(duplicates) - self._deduped)
+            self._deduped = len(duplicates)
+        return duplicates
     
-    def filter_jobs(self, min_keywords_match=2):
-        """Filter jobs based on keyword match score"""
-        return self.jobs_df[self.jobs_df['Keywords_Match'] >= min_keywords_match].sort_values('Keywords_Match', ascending=False)
+    def dedupe_jobs(self, jobs_df=None):
+        """Drop every near-duplicate posting, keeping one canonical row per cluster"""
+        jobs_df = self.jobs_df if jobs_df is None else jobs_df
+        duplicates = self._duplicate_ids()
+        return jobs_df[~jobs_df.index.isin(duplicates)] if len(duplicates) else jobs_df
+    
+    def filter_jobs(self, min_keywords_match=2, keywords=None, profile_text=None, top_k=None):
+        """
+        Filter jobs based on keyword match score, optionally re-ranked against new keywords.
+        With profile_text, return the top_k (default 50) postings ranked by relevance instead.
+        """
+        if profile_text:
+            return self.rank_jobs(profile_text, top_k or 50)
+        jobs_df = self.dedupe_jobs(self.score_jobs(keywords))
+        filtered = jobs_df[jobs_df['Keywords_Match'] >= min_keywords_match].sort_values('Keywords_Match', ascending=False)
+        return filtered.head(top_k) if top_k else filtered
     
     def save_jobs(self, filename='job_listings.csv'):
         """Save job listings to CSV"""
-        path = '/content/drive/My Drive/' + filename
-        self.jobs_df.to_csv(path, index=False)
-        print(f"Saved {len(self.jobs_df)} jobs to {path}")
+        output = get_output()
+        path = output.path(filename)
+        jobs_df = self.score_jobs()
+        jobs_df.to_csv(path, index=False)
+        output.add(path)
+        print(f"Saved {len(jobs_df)} jobs to {path}")
         return path
 
+
+class QueryPlanner:
+    """
+    Plans one search sweep for several keyword profiles at once. Keyword sets and
+    locations are normalized and deduplicated; for each source and location the
+    profiles that want it share a single query, their keyword sets joined with the
+    source's OR (a set that contains another set's keywords adds nothing and is
+    dropped). Each query gets a page budget that grows with the number of keyword
+    sets it carries (extra_page_share of the base budget per extra set), up to the
+    source's max_pages. route() then hands every stored
+    posting to each profile whose keywords it matches and whose locations it was
+    searched in, so N profiles cost about the requests of one.
+    """
+    REMOTE_ALIASES = ('remote', 'work from home', 'anywhere')
+    
+    def __init__(self, sources=None, merge=True, max_clauses=6, extra_page_share=0.25):
+        self.sources = sources or JOB_SOURCES
+        self.merge = merge
+        self.max_clauses = max_clauses
+        self.extra_page_share = extra_page_share
+        self.stats = {}
+    
+    @staticmethod
+    def profiles(profiles):
+        """
+        Accept a keyword string, a list of them, or {name: keywords} / {name: {'keywords': ...,
+        'locations': [...], 'min_keywords_match': n}}; return {name: settings}
+        """
+        if isinstance(profiles, str):
+            profiles = [profiles]
+        if not isinstance(profiles, dict):
+            profiles = {f"profile_{i + 1}": keywords for i, keywords in enumerate(profiles)}
+        normalized = {}
+        for name, profile in profiles.items():
+            if not isinstance(profile, dict):
+                profile = {'keywords': profile}
+            normalized[name] = {
+                'keywords': ' '.join(profile['keywords'].split()),
+                'locations': profile.get('locations'),
+                'min_keywords_match': profile.get('min_keywords_match', 2),
+            }
+        return normalized
+    
+    @classmethod
+    def location_key(cls, location):
+        """(city, remote) for a search or posting location: 'Remote in New York, NY' -> ('new york', True)"""
+        text = (location or '').lower()
+        if text in ('', 'n/a'):
+            return '', False
+        remote = any(alias in text for alias in cls.REMOTE_ALIASES)
+        city = re.sub(r'\(.*?\)|\b(?:hybrid|remote|work from home|anywhere|in)\b', ' ', text.split(',')[0])
+        return ' '.join(re.findall(r'[a-z0-9]+', city)), remote
+    
+    def _clauses(self, keyword_sets):
+        """Distinct keyword sets, minus any whose words include another set's (an AND query it already covers)"""
+        token_sets = {}
+        for keywords in keyword_sets:
+            token_sets.setdefault(frozenset(keywords.lower().split()), keywords)
+        return [keywords for tokens, keywords in token_sets.items()
+                if not any(other < tokens for other in token_sets)]
+    
+    def plan(self, profiles, locations=None, sources=('indeed', 'linkedin')):
+        """
+        Return (source, keywords, location, pages) queries for JobRetriever.search covering every
+        profile; a profile without its own locations is searched in `locations`.
+        """
+        profiles = self.profiles(profiles)
+        # Locations are deduplicated on their normalized form, keeping the first spelling
+        wanted = {}
+        for profile in profiles.values():
+            for location in profile['locations'] or locations or []:
+                key = self.location_key(location)
+                spelling, keyword_sets = wanted.setdefault(key, ('Remote' if key == ('', True) else
+                                                                 ' '.join(location.split()), []))
+                keyword_sets.append(profile['keywords'])
+        
+        queries = []
+        naive_pages = 0
+        for source in sources:
+            settings = self.sources[source]
+            for location, keyword_sets in wanted.values():
+                naive_pages += settings['pages'] * len(keyword_sets)
+                clauses = self._clauses(keyword_sets)
+                groups = ([clauses[i:i + self.max_clauses] for i in range(0, len(clauses), self.max_clauses)]
+                          if self.merge else [[clause] for clause in clauses])
+                for group in groups:
+                    # The sets overlap heavily in what they return, so each extra one adds only a share of the budget
+                    pages = min(settings['max_pages'],
+                                math.ceil(settings['pages'] * (1 + self.extra_page_share * (len(group) - 1))))
+                    keywords = group[0] if len(group) == 1 else tuple(group)
+                    queries.append((source, keywords, location, pages))
+        
+        self.stats = {'profiles': len(profiles), 'locations': len(wanted), 'queries': len(queries),
+                      'pages': sum(query[3] for query in queries), 'unplanned_pages': naive_pages}
+        print(f"Search plan: {len(profiles)} profiles x {len(wanted)} locations x {len(sources)} sources -> "
+              f"{len(queries)} queries, at most {self.stats['pages']} pages (unplanned: {naive_pages})")
+        return queries
+    
+    def _covering_hits(self, hits, profile, profile_locations):
+        """URLs returned by the planned queries that searched for this profile"""
+        tokens = frozenset(profile['keywords'].lower().split())
+        wanted = {self.location_key(location) for location in profile_locations}
+        covered = set()
+        for (source, keywords, location), urls in hits.items():
+            clauses = keywords if isinstance(keywords, tuple) else (keywords,)
+            # A clause whose words are a subset of the profile's also covered it (see _clauses)
+            if self.location_key(location) in wanted and any(frozenset(clause.lower().split()) <= tokens
+                                                              for clause in clauses):
+                covered |= urls
+        return covered
+    
+    def route(self, retriever, profiles, locations=None, top_k=None):
+        """
+        {profile name: its matching postings, best Keywords_Match first} over everything stored.
+        A posting the last search found is routed by the queries that returned it, since sites
+        also return postings from around the searched location; stored postings that search did
+        not return are matched on their location text.
+        """
+        profiles = self.profiles(profiles)
+        jobs_df = retriever.jobs_df
+        posting_locations = jobs_df['Location'].map(self.location_key)
+        cities = posting_locations.str[0]
+        remote = posting_locations.str[1].astype(bool)
+        unknown = (cities == '') & ~remote
+        hits = retriever.query_hits
+        found = jobs_df['URL'].isin(set().union(*hits.values())) if hits else None
+        
+        routed = {}
+        for name, profile in profiles.items():
+            scored = retriever.score_jobs(profile['keywords'])
+            mask = scored['Keywords_Match'] >= profile['min_keywords_match']
+            profile_locations = profile['locations'] or locations
+            if profile_locations:
+                # Postings without a location are kept; remote ones go to every profile that accepts remote
+                in_place = unknown.copy()
+                for city, wants_remote in map(self.location_key, profile_locations):
+                    if city:
+                        in_place |= cities.str.startswith(city)
+                    if wants_remote:
+                        in_place |= remote
+                if found is not None:
+                    in_place = (jobs_df['URL'].isin(self._covering_hits(hits, profile, profile_locations))
+                                | (~found & in_place))
+                mask &= in_place
+            matches = retriever.dedupe_jobs(scored[mask]).sort_values('Keywords_Match', ascending=False)
+            routed[name] = matches.head(top_k) if top_k else matches
+        return routed
+
 # 2. Resume and Cover Letter Customizer
+def ensure_nltk_data(resource_path, package):
+    """Import NLTK on first use and download a data package only if it is missing"""
+    import nltk
+    try:
+        nltk.data.find(resource_path)
+    except LookupError:
+        nltk.download(package, quiet=True)
+    return nltk
+
+
+class Tokenizer:
+    """
+    Lowercasing regex tokenizer for job descriptions. Keeps alphanumeric runs
+    (what word_tokenize + isalnum kept) and drops English stopwords. The stopword
+    frozenset is loaded from NLTK once per process and shared by every instance.
+    """
+    TOKEN_PATTERN = re.compile(r'[^\W_]+')
+    _stop_words = None
+    _lock = threading.Lock()
+    
+    @classmethod
+    def stop_words(cls):
+        if cls._stop_words is None:
+            with cls._lock:
+                if cls._stop_words is None:
+                    try:
+                        nltk = ensure_nltk_data('corpora/stopwords', 'stopwords')
+                        words = nltk.corpus.stopwords.words('english')
+                    except (ImportError, LookupError) as e:
+                        # Fall back to scikit-learn's list rather than failing the whole batch
+                        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+                        print(f"NLTK stopwords unavailable ({type(e).__name__}), using scikit-learn's list")
+                        words = ENGLISH_STOP_WORDS
+                    cls._stop_words = frozenset(words)
+        return cls._stop_words
+    
+    def __call__(self, text):
+        stop_words = self.stop_words()
+        return [token for token in self.TOKEN_PATTERN.findall(text.lower()) if token not in stop_words]
+
+
+tokenize = Tokenizer()
+
+
+def benchmark_tokenizers(descriptions=None, fixture_dir='fixtures', copies=200):
+    """
+    Compare tokens/second of the regex Tokenizer with the previous NLTK paths:
+    word_tokenize plus a stopword set rebuilt per call, and the copilot-mod variant
+    that calls stopwords.words() once per token (timed on a small sample, it is slow).
+    """
+    if descriptions is None:
+        with open(os.path.join(fixture_dir, 'linkedin_job.html'), encoding='utf-8') as f:
+            description = get_card_parser().parse_description(f.read())
+        descriptions = [description] * copies
+    
+    def per_call_set(text):
+        tokens = nltk.tokenize.word_tokenize(text.lower())
+        stop_words = set(nltk.corpus.stopwords.words('english'))
+        return [word for word in tokens if word.isalnum() and word not in stop_words]
+    
+    def per_token_list(text):
+        tokens = nltk.tokenize.word_tokenize(text.lower())
+        return [word for word in tokens if word.isalnum() and word not in nltk.corpus.stopwords.words('english')]
+    
+    candidates = [('regex Tokenizer', tokenize, descriptions)]
+    try:
+        nltk = ensure_nltk_data('tokenizers/punkt_tab', 'punkt_tab')
+        ensure_nltk_data('corpora/stopwords', 'stopwords')
+        nltk.tokenize.word_tokenize("warm up")
+        candidates += [('word_tokenize + set per call', per_call_set, descriptions),
+                       ('word_tokenize + list per token', per_token_list, descriptions[:5])]
+    except (ImportError, LookupError) as e:
+        print(f"NLTK tokenizers unavailable ({type(e).__name__}), only timing the regex Tokenizer")
+    
+    words = sum(len(text.split()) for text in descriptions) / len(descriptions)
+    print(f"{len(descriptions)} descriptions, ~{words:.0f} words each")
+    report = {}
+    for name, func, texts in candidates:
+        start = time.perf_counter()
+        token_count = sum(len(func(text)) for text in texts)
+        elapsed = time.perf_counter() - start
+        report[name] = token_count / elapsed
+        print(f"  {name:<32} {report[name]:>12,.0f} tokens/s")
+    return report
+
+
+class KeywordExtractor:
+    """
+    Corpus-level TF-IDF keyword extraction. One vectorizer is fitted over every
+    description in a batch, so IDF actually down-weights boilerplate shared by all
+    postings, and the top-k terms of every row are picked in one vectorized pass
+    over the sparse matrix.
+    """
+    def __init__(self, top_k=10):
+        self.top_k = top_k
+        self.vectorizer = None
+        self.keywords = {}
+        self.fitted_on = None
+        self.lock = threading.Lock()
+    
+    def fit(self, descriptions):
+        """
+        Fit on a collection of descriptions and precompute keywords for each of them.
+        Refitting on the same corpus (e.g. from another profile sharing this model) is a no-op.
+        """
+        documents = list(dict.fromkeys(d for d in descriptions if isinstance(d, str) and d and d != "N/A"))
+        if not documents:
+            return self
+        fingerprint = (len(documents), hash(tuple(documents)))
+        with self.lock:
+            if fingerprint == self.fitted_on:
+                return self
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            self.vectorizer = TfidfVectorizer(analyzer=tokenize, sublinear_tf=True)
+            matrix = self.vectorizer.fit_transform(documents)
+            self.keywords = dict(zip(documents, self._top_terms(matrix)))
+            self.fitted_on = fingerprint
+        print(f"Keyword model fitted on {len(documents)} descriptions ({len(self.vectorizer.vocabulary_)} terms)")
+        return self
+    
+    def _top_terms(self, matrix):
+        """Top-k terms per row of a CSR matrix without densifying it or sorting in Python"""
+        matrix = matrix.tocsr()
+        feature_names = self.vectorizer.get_feature_names_out()
+        row_ids = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+        # Sort every stored entry by (row, descending score) at once, then keep the first k of each row
+        order = np.lexsort((-matrix.data, row_ids))
+        rank = np.arange(len(order)) - matrix.indptr[row_ids[order]]
+        keep = order[rank < self.top_k]
+        
+        top_terms = [[] for _ in range(matrix.shape[0])]
+        for row, column in zip(row_ids[keep], matrix.indices[keep]):
+            top_terms[row].append(feature_names[column])
+        return top_terms
+    
+    def keywords_for(self, description):
+        """Keywords for one description, transforming it with the fitted corpus IDF if it is new"""
+        if description in self.keywords:
+            return self.keywords[description]
+        if self.vectorizer is None:
+            self.fit([description])
+            return self.keywords.get(description, [])
+        keywords = self._top_terms(self.vectorizer.transform([description]))[0]
+        self.keywords[description] = keywords
+        return keywords
+
+
+class CompiledTemplate:
+    """
+    A .docx template compiled once into the form each render needs: which body
+    paragraphs hold placeholders like [OBJECTIVE] or [KEYWORD1], whether each
+    placeholder sits inside a single run, and a word -> paragraphs index for
+    keyword highlighting. Rendering copies the template and edits only the
+    paragraphs that change, run by run so their formatting is kept.
+    """
+    PLACEHOLDER_PATTERN = re.compile(r'\[[A-Z][A-Z0-9_]*\]')
+    
+    def __init__(self, path):
+        from docx import Document
+        self.path = path
+        with open(path, 'rb') as f:
+            self.source = f.read()
+        self.document = Document(io.BytesIO(self.source))
+        
+        self.placeholders = {}      # paragraph index -> placeholders it contains
+        self.split_runs = set()     # paragraphs where a placeholder spans several runs
+        self.word_index = {}        # lowercase word -> paragraph indices containing it
+        for index, para in enumerate(self.document.paragraphs):
+            text = para.text
+            found = set(self.PLACEHOLDER_PATTERN.findall(text))
+            if found:
+                self.placeholders[index] = found
+                if not self._placeholders_within_runs(para, text):
+                    self.split_runs.add(index)
+            for word in set(Tokenizer.TOKEN_PATTERN.findall(text.lower())):
+                self.word_index.setdefault(word, set()).add(index)
+    
+    def _placeholders_within_runs(self, para, text):
+        run_texts = [run.text for run in para.runs]
+        if ''.join(run_texts) != text:
+            return False
+        boundaries = np.cumsum([0] + [len(run_text) for run_text in run_texts])
+        for match in self.PLACEHOLDER_PATTERN.finditer(text):
+            run = np.searchsorted(boundaries, match.start(), side='right') - 1
+            if match.end() > boundaries[run + 1]:
+                return False
+        return True
+    
+    def render(self, replacements, highlight=()):
+        """
+        Return a new Document with placeholders substituted in the paragraphs that hold
+        them and, elsewhere, the highlight words wrapped in ** in the paragraphs containing them.
+        """
+        from docx import Document
+        from docx.text.paragraph import Paragraph
+        document = Document(io.BytesIO(self.source))
+        paragraph_elements = document.element.body.xpath('./w:p')
+        
+        substituted = {index for index, found in self.placeholders.items() if found & replacements.keys()}
+        if substituted:
+            pattern = re.compile('|'.join(re.escape(placeholder) for placeholder in replacements))
+            replace = lambda match: replacements[match.group(0)]
+            for index in substituted:
+                self._rewrite(Paragraph(paragraph_elements[index], document._body), pattern, replace,
+                              index in self.split_runs)
+        
+        words = {word.lower() for word in highlight if word.lower() in self.word_index}
+        if words:
+            touched = set().union(*(self.word_index[word] for word in words)) - substituted
+            alternation = '|'.join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+            pattern = re.compile(rf'(?<![^\W_])(?:{alternation})(?![^\W_])', re.IGNORECASE)
+            replace = lambda match: f"**{match.group(0).lower()}**"
+            for index in touched:
+                self._rewrite(Paragraph(paragraph_elements[index], document._body), pattern, replace, False)
+        return document
+    
+    @staticmethod
+    def _rewrite(para, pattern, replace, collapse_runs):
+        if collapse_runs:
+            # The placeholder is split across runs: rewrite the text into the first run
+            text = pattern.sub(replace, para.text)
+            runs = para.runs
+            if runs:
+                runs[0].text = text
+                for run in runs[1:]:
+                    run.text = ""
+            return
+        for run in para.runs:
+            new_text = pattern.sub(replace, run.text)
+            if new_text != run.text:
+                run.text = new_text
+
+
+_template_cache = {}
+_template_cache_lock = threading.Lock()
+
+
+def load_template(path):
+    """Compile a template once per process and reuse it until the file changes"""
+    key = (path, os.path.getmtime(path))
+    with _template_cache_lock:
+        if key not in _template_cache:
+            _template_cache[key] = CompiledTemplate(path)
+        return _template_cache[key]
+
+
 class DocumentCustomizer:
-    def __init__(self, resume_path, cover_letter_path):
+    def __init__(self, resume_path, cover_letter_path, keyword_extractor=None, output_subdir=''):
         """
-        Initialize with paths to resume and cover letter templates
+        Initialize with paths to resume and cover letter templates.
+        Documents are saved under output_subdir of the output folder (e.g. one per profile).
         """
         self.resume_path = resume_path
         self.cover_letter_path = cover_letter_path
+        self.output_subdir = output_subdir
         self.resume_doc = None
         self.cover_letter_doc = None
+        self.resume_template = None
+        self.cover_letter_template = None
+        # Shared with the batch so the resume and cover letter reuse one extraction per job
+        self.keyword_extractor = keyword_extractor or KeywordExtractor()
         self.load_documents()
     
     def load_documents(self):
         """Load the Word documents"""
         try:
-            self.resume_doc = Document(self.resume_path)
-            self.cover_letter_doc = Document(self.cover_letter_path)
+            self.resume_template = load_template(self.resume_path)
+            self.cover_letter_template = load_template(self.cover_letter_path)
+            self.resume_doc = self.resume_template.document
+            self.cover_letter_doc = self.cover_letter_template.document
             print("Documents loaded successfully")
         except Exception as e:
             print(f"Error loading documents: {str(e)}")
     
+    def resume_text(self):
+        """Plain text of the resume template"""
+        if not self.resume_doc:
+            return ""
+        return "\n".join(para.text for para in self.resume_doc.paragraphs)
+    
+    @timed('fit_keywords')
+    def fit_keywords(self, descriptions):
+        """Fit the keyword model over a whole batch of job descriptions"""
+        self.keyword_extractor.fit(descriptions)
+    
+    @timed('extract_keywords')
     def extract_job_keywords(self, job_description):
         """Extract important keywords from job description"""
-        # Tokenize and preprocess
-        tokens = word_tokenize(job_description.lower())
-        stop_words = set(stopwords.words('english'))
-        filtered_tokens = [word for word in tokens if word.isalnum() and word not in stop_words]
-        
-        # Use TF-IDF to find important terms
-        vectorizer = TfidfVectorizer(max_features=20)
-        tfidf_matrix = vectorizer.fit_transform([' '.join(filtered_tokens)])
-        feature_names = vectorizer.get_feature_names_out()
-        
-        # Get top keywords
-        dense = tfidf_matrix.todense()
-        words_importance = dense[0].tolist()[0]
-        word_scores = [(word, words_importance[i]) for i, word in enumerate(feature_names)]
-        word_scores.sort(key=lambda x: x[1], reverse=True)
-        
-        return [word for word, score in word_scores[:10]]
-    
-    def customize_resume(self, job_title, company_name, job_description):
-        """Customize resume based on job details"""
+        return self.keyword_extractor.keywords_for(job_description)
+    
+    def _save(self, document, prefix, job_title, company_name, job_key=None):
+        """
+        Save a rendered document under a name unique to the job (several postings can share a
+        company and a day), writing a temporary file first so a reader never sees a partial one
+        """
+        job_id = hashlib.sha1((job_key or f"{job_title}|{company_name}").encode('utf-8')).hexdigest()[:8]
+        filename = f"{prefix}_{company_name}_{datetime.now().strftime('%Y%m%d')}_{job_id}.docx"
+        save_path = get_output().path(os.path.join(self.output_subdir, filename))
+        partial_path = f"{save_path}.{os.getpid()}.partial"
+        document.save(partial_path)
+        os.replace(partial_path, save_path)
+        get_output().add(save_path)
+        metrics.incr('documents.written')
+        return save_path
+    
+    @timed('customize_resume')
+    def customize_resume(self, job_title, company_name, job_description, job_key=None):
+        """Customize resume based on job details; job_key (e.g. the posting URL) names the file"""
         if not self.resume_doc:
             print("Resume document not loaded")
             return None
         
-        # Create a copy of the resume
-        custom_resume = Document()
-        
         # Extract keywords from job description
         keywords = self.extract_job_keywords(job_description)
         print(f"Keywords extracted: {keywords}")
         
-        # Customize the resume sections
-        for para in self.resume_doc.paragraphs:
-            # Add job-specific objective
-            if "[OBJECTIVE]" in para.text:
-                custom_text = para.text.replace("[OBJECTIVE]", 
-                    f"Experienced professional seeking the {job_title} position at {company_name}, bringing expertise in " + 
-                    ", ".join(keywords[:3]) + ".")
-                custom_resume.add_paragraph(custom_text, para.style)
-            else:
-                # Highlight keywords in the resume
-                text = para.text
-                for keyword in keywords:
-                    if keyword.lower() in text.lower() and len(keyword) > 3:  # Only highlight meaningful words
-                        pattern = re.compile(re.escape(keyword), re.IGNORECASE)
-                        text = pattern.sub(f"**{keyword}**", text)
-                
-                custom_resume.add_paragraph(text, para.style)
+        # Add a job-specific objective and highlight keywords everywhere else
+        objective = (f"Experienced professional seeking the {job_title} position at {company_name}, bringing expertise in " +
+                     ", ".join(keywords[:3]) + ".")
+        highlight = [keyword for keyword in keywords if len(keyword) > 3]  # Only highlight meaningful words
+        custom_resume = self.resume_template.render({"[OBJECTIVE]": objective}, highlight)
         
         # Save the customized resume
-        filename = f"Custom_Resume_{company_name}_{datetime.now().strftime('%Y%m%d')}.docx"
-        save_path = f"/content/drive/My Drive/{filename}"
-        custom_resume.save(save_path)
+        save_path = self._save(custom_resume, "Custom_Resume", job_title, company_name, job_key)
         print(f"Customized resume saved to {save_path}")
         
         return save_path
     
-    def customize_cover_letter(self, job_title, company_name, job_description):
-        """Customize cover letter based on job details"""
+    @timed('customize_cover_letter')
+    def customize_cover_letter(self, job_title, company_name, job_description, job_key=None):
+        """Customize cover letter based on job details; job_key (e.g. the posting URL) names the file"""
         if not self.cover_letter_doc:
             print("Cover letter document not loaded")
             return None
         
-        # Create a copy of the cover letter
-        custom_cover_letter = Document()
-        
         # Extract keywords from job description
         keywords = self.extract_job_keywords(job_description)
         
         # Current date
         current_date = datetime.now().strftime("%B %d, %Y")
         
-        # Customize the cover letter
-        for para in self.cover_letter_doc.paragraphs:
-            text = para.text
-            
-            # Replace placeholders
-            replacements = {
-                "[DATE]": current_date,
-                "[COMPANY_NAME]": company_name,
-                "[JOB_TITLE]": job_title,
-                "[KEYWORD1]": keywords[0] if keywords else "",
-                "[KEYWORD2]": keywords[1] if len(keywords) > 1 else "",
-                "[KEYWORD3]": keywords[2] if len(keywords) > 2 else ""
-            }
-            
-            for placeholder, value in replacements.items():
-                text = text.replace(placeholder, value)
-            
-            custom_cover_letter.add_paragraph(text, para.style)
+        # Replace placeholders
+        replacements = {
+            "[DATE]": current_date,
+            "[COMPANY_NAME]": company_name,
+            "[JOB_TITLE]": job_title,
+            "[KEYWORD1]": keywords[0] if keywords else "",
+            "[KEYWORD2]": keywords[1] if len(keywords) > 1 else "",
+            "[KEYWORD3]": keywords[2] if len(keywords) > 2 else ""
+        }
+        custom_cover_letter = self.cover_letter_template.render(replacements)
         
         # Save the customized cover letter
-        filename = f"Cover_Letter_{company_name}_{datetime.now().strftime('%Y%m%d')}.docx"
-        save_path = f"/content/drive/My Drive/{filename}"
-        custom_cover_letter.save(save_path)
+        save_path = self._save(custom_cover_letter, "Cover_Letter", job_title, company_name, job_key)
         print(f"Customized cover letter saved to {save_path}")
         
         return save_path
 
 # 3. Google Calendar Integration for Follow-up Reminders
 class CalendarManager:
-    def __init__(self):
-        """Initialize Google Calendar API"""
-        self.creds = None
+    BATCH_LIMIT = 50   # Calendar API maximum requests per batch call
+    
+    def __init__(self, api_root=None, credentials=None, token_path=None, interactive=True):
+        """
+        Initialize Google Calendar API.
+        api_root points the client at another server (e.g. a local stand-in, with
+        anonymous credentials unless others are given) instead of googleapis.com.
+        token_path overrides the saved token's location; with interactive=False (headless
+        runs) a missing or unusable token disables reminders instead of opening a browser flow.
+        """
+        self.creds = credentials
         self.SCOPES = ['https://www.googleapis.com/auth/calendar']
-        self.credentials_path = '/content/drive/My Drive/credentials.json'
-        self.token_path = '/content/drive/My Drive/token.pickle'
+        self.credentials_path = os.path.join(DRIVE_DIR, 'credentials.json')
+        self.token_path = token_path or os.path.join(DRIVE_DIR, 'token.pickle')
+        self.interactive = interactive
+        self.api_root = api_root.rstrip('/') + '/' if api_root else None
         self.service = None
+        self.pending_reminders = {}
         self.authenticate()
     
     def authenticate(self):
         """Authenticate with Google Calendar API"""
+        from googleapiclient.discovery import build
+        if self.api_root:
+            from google.auth.credentials import AnonymousCredentials
+            try:
+                self.service = build('calendar', 'v3', credentials=self.creds or AnonymousCredentials(),
+                                     client_options={'api_endpoint': self.api_root + 'calendar/v3/'},
+                                     static_discovery=True)
+                print(f"Using Google Calendar API at {self.api_root}")
+            except Exception as e:
+                print(f"Error connecting to Calendar API at {self.api_root}: {str(e)}")
+            return
         try:
             if os.path.exists(self.token_path):
                 with open(self.token_path, 'rb') as token:
@@ -324,8 +2664,13 @@ class CalendarManager:
             # If credentials don't exist or are invalid
             if not self.creds or not self.creds.valid:
                 if self.creds and self.creds.expired and self.creds.refresh_token:
+                    from google.auth.transport.requests import Request
                     self.creds.refresh(Request())
+                elif not self.interactive:
+                    print(f"No usable Calendar token at {self.token_path}, follow-up reminders are disabled")
+                    return
                 else:
+                    from google_auth_oauthlib.flow import InstalledAppFlow
                     flow = InstalledAppFlow.from_client_secrets_file(
                         self.credentials_path, self.SCOPES)
                     self.creds = flow.run_local_server(port=0)
@@ -340,12 +2685,16 @@ class CalendarManager:
         except Exception as e:
             print(f"Error authenticating with Google Calendar: {str(e)}")
     
-    def set_follow_up_reminder(self, job_title, company_name, application_date=None, follow_up_days=5):
-        """Set a follow-up reminder in Google Calendar"""
-        if not self.service:
-            print("Calendar service not initialized")
-            return False
-        
+    @staticmethod
+    def reminder_event_id(job_url, job_title=None, company_name=None):
+        """
+        Deterministic event ID for a job's reminder, so re-inserting it is detected as a
+        duplicate. Hex digests only use characters allowed in Calendar event IDs.
+        """
+        key = job_url if job_url and job_url != "N/A" else f"{job_title}|{company_name}"
+        return hashlib.sha1(f"follow-up|{key}".encode('utf-8')).hexdigest()
+    
+    def _follow_up_event(self, job_title, company_name, application_date=None, follow_up_days=5):
         if not application_date:
             application_date = datetime.now()
         elif isinstance(application_date, str):
@@ -372,37 +2721,207 @@ class CalendarManager:
                 ],
             },
         }
+        return event, follow_up_date
+    
+    @timed('set_reminder')
+    def set_follow_up_reminder(self, job_title, company_name, application_date=None, follow_up_days=5, job_url=None):
+        """Set a follow-up reminder in Google Calendar"""
+        from googleapiclient.errors import HttpError
+        if not self.service:
+            print("Calendar service not initialized")
+            return False
+        
+        event, follow_up_date = self._follow_up_event(job_title, company_name, application_date, follow_up_days)
+        if job_url:
+            event['id'] = self.reminder_event_id(job_url, job_title, company_name)
         
         try:
             event = self.service.events().insert(calendarId='primary', body=event).execute()
             print(f"Follow-up reminder set for {follow_up_date.strftime('%Y-%m-%d')}")
+            metrics.incr('reminders.created')
             return True
+        except HttpError as e:
+            if e.resp.status == 409:
+                print(f"Follow-up reminder for {job_title} at {company_name} already exists")
+                metrics.incr('reminders.exists')
+                return True
+            print(f"Error setting reminder: {str(e)}")
+            metrics.incr('reminders.failed')
+            return False
         except Exception as e:
             print(f"Error setting reminder: {str(e)}")
+            metrics.incr('reminders.failed')
             return False
+    
+    def queue_follow_up_reminder(self, job_title, company_name, application_date=None, follow_up_days=5, job_url=None):
+        """Queue a reminder for the next flush_reminders() call and return its event ID"""
+        event, _ = self._follow_up_event(job_title, company_name, application_date, follow_up_days)
+        event['id'] = self.reminder_event_id(job_url, job_title, company_name)
+        self.pending_reminders[event['id']] = event
+        return event['id']
+    
+    @timed('flush_reminders')
+    def flush_reminders(self, chunk_size=BATCH_LIMIT):
+        """
+        Send every queued reminder through the Calendar batch endpoint, chunk_size per call.
+        Returns {event_id: 'created' | 'exists' | 'disabled' | 'failed: <reason>'}; an event whose ID
+        is already on the calendar comes back as a 409 and is reported as 'exists', and every event
+        is 'disabled' when there is no calendar service (e.g. headless runs without a token).
+        """
+        from googleapiclient.errors import HttpError
+        from googleapiclient.http import BatchHttpRequest
+        pending, self.pending_reminders = self.pending_reminders, {}
+        if not pending:
+            return {}
+        if not self.service:
+            print("Calendar service not initialized")
+            return {event_id: 'disabled' for event_id in pending}
+        
+        results = {}
+        def record(event_id, response, exception):
+            if exception is None:
+                results[event_id] = 'created'
+            elif isinstance(exception, HttpError) and exception.resp.status == 409:
+                results[event_id] = 'exists'
+            else:
+                results[event_id] = f'failed: {str(exception)}'
+        
+        event_ids = list(pending)
+        for start in range(0, len(event_ids), chunk_size):
+            if self.api_root:
+                batch = BatchHttpRequest(callback=record, batch_uri=self.api_root + 'batch/calendar/v3')
+            else:
+                batch = self.service.new_batch_http_request(callback=record)
+            for event_id in event_ids[start:start + chunk_size]:
+                batch.add(self.service.events().insert(calendarId='primary', body=pending[event_id]),
+                          request_id=event_id)
+            try:
+                batch.execute()
+            except Exception as e:
+                for event_id in event_ids[start:start + chunk_size]:
+                    results.setdefault(event_id, f'failed: {str(e)}')
+        
+        created = sum(1 for result in results.values() if result == 'created')
+        existing = sum(1 for result in results.values() if result == 'exists')
+        print(f"Follow-up reminders: {created} created, {existing} already existed, "
+              f"{len(results) - created - existing} failed")
+        metrics.incr('reminders.created', created)
+        metrics.incr('reminders.exists', existing)
+        metrics.incr('reminders.failed', len(results) - created - existing)
+        return results
 
 # 4. Main Application Manager
+def document_pool(workers):
+    """
+    Executor for parallel document generation: forked worker processes where fork is
+    available (Linux, Colab), otherwise threads in this process (Windows, and macOS where
+    fork is unsafe), since spawned workers would not share the output folder or templates
+    """
+    if FORK_AVAILABLE:
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork'))
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix='documents')
+
+
+# Per-process state for parallel document generation: one customizer per template set, so a
+# pool can be shared by several profiles (templates loaded before the fork are inherited)
+_worker_customizers = {}
+
+
+def _customize_documents(templates, job_title, company, description, keywords, job_key=None):
+    """
+    Build and save the resume and cover letter for one job inside a worker process.
+    templates is (resume_path, cover_letter_path, output_subdir); keywords were
+    extracted in the parent from the fitted model.
+    """
+    customizer = _worker_customizers.get(templates)
+    if customizer is None:
+        resume_path, cover_letter_path, output_subdir = templates
+        customizer = _worker_customizers[templates] = DocumentCustomizer(
+            resume_path, cover_letter_path, output_subdir=output_subdir)
+    customizer.keyword_extractor.keywords[description] = keywords
+    try:
+        resume_path = customizer.customize_resume(job_title, company, description, job_key)
+        cover_letter_path = customizer.customize_cover_letter(job_title, company, description, job_key)
+    finally:
+        customizer.keyword_extractor.keywords.pop(description, None)
+    # Pool workers can exit without a final flush, so send this job's metrics now
+    metrics.flush()
+    return resume_path, cover_letter_path
+
 class JobApplicationManager:
-    def __init__(self, resume_path, cover_letter_path):
-        """Initialize the job application manager"""
-        self.job_retriever = JobRetriever()
-        self.document_customizer = DocumentCustomizer(resume_path, cover_letter_path)
-        self.calendar_manager = CalendarManager()
-        self.applied_jobs = pd.DataFrame(columns=[
-            'Title', 'Company', 'Location', 'URL', 'Application_Date', 
-            'Resume_Path', 'CoverLetter_Path', 'FollowUp_Set'
-        ])
-    
-    def search_jobs(self, keywords, locations):
-        """Search for jobs across multiple sources and locations"""
-        for location in locations:
-            self.job_retriever.search_indeed(keywords, location)
-            self.job_retriever.search_linkedin(keywords, location)
-        
-        filtered_jobs = self.job_retriever.filter_jobs()
+    def __init__(self, resume_path, cover_letter_path, store=None, calendar_api_root=None, job_retriever=None,
+                 keyword_extractor=None, output_subdir='', calendar_options=None):
+        """
+        Initialize the job application manager.
+        calendar_api_root is passed on to CalendarManager (e.g. a local stand-in server),
+        along with any other calendar_options.
+        Several managers can share one job_retriever (the scraped corpus) and keyword_extractor;
+        each keeps its applications and journal in its own store and writes under output_subdir.
+        """
+        self.job_retriever = job_retriever or JobRetriever(store=store)
+        self.store = store or self.job_retriever.store
+        self.planner = QueryPlanner()
+        self.resume_path = resume_path
+        self.cover_letter_path = cover_letter_path
+        self.calendar_api_root = calendar_api_root
+        self.calendar_options = calendar_options or {}
+        self.keyword_extractor = keyword_extractor
+        self.output_subdir = output_subdir
+        # Templates and Calendar credentials are only loaded once a run actually needs them
+        self._document_customizer = None
+        self._calendar_manager = None
+    
+    @property
+    def document_customizer(self):
+        if self._document_customizer is None:
+            self._document_customizer = DocumentCustomizer(self.resume_path, self.cover_letter_path,
+                                                           keyword_extractor=self.keyword_extractor,
+                                                           output_subdir=self.output_subdir)
+        return self._document_customizer
+    
+    @property
+    def calendar_manager(self):
+        if self._calendar_manager is None:
+            self._calendar_manager = CalendarManager(api_root=self.calendar_api_root, **self.calendar_options)
+        return self._calendar_manager
+    
+    @property
+    def applied_jobs(self):
+        """Record of applications, loaded lazily from the JobStore"""
+        return self.store.frame('applied_jobs')
+    
+    @timed('search_jobs')
+    def search_jobs(self, keywords, locations, sources=('indeed', 'linkedin'), profile_text=None, top_k=None,
+                    incremental=None):
+        """
+        Search for jobs across multiple sources and locations.
+        Pass profile_text (e.g. resume_text()) to rank results by relevance instead of keyword count.
+        With incremental=True only postings new since the last run of each search are fetched.
+        """
+        # All locations x sources x pages go out as one concurrent sweep
+        queries = self.planner.plan(keywords, locations, sources)
+        self.job_retriever.search(queries, incremental)
+        
+        filtered_jobs = self.job_retriever.filter_jobs(profile_text=profile_text, top_k=top_k)
         print(f"Found {len(filtered_jobs)} matching jobs")
         return filtered_jobs
     
+    @timed('search_profiles')
+    def search_profiles(self, profiles, locations=(), sources=('indeed', 'linkedin'), incremental=None, top_k=None):
+        """
+        Search for several keyword profiles in one planned sweep and return {name: matching jobs}.
+        profiles is {name: keywords} or {name: {'keywords', 'locations', 'min_keywords_match'}};
+        profiles without their own locations use `locations`.
+        """
+        queries = self.planner.plan(profiles, locations, sources)
+        self.job_retriever.search(queries, incremental)
+        
+        routed = self.planner.route(self.job_retriever, profiles, locations, top_k)
+        for name, jobs in routed.items():
+            print(f"{name}: {len(jobs)} matching jobs")
+        return routed
+    
+    @timed('apply_to_job')
     def apply_to_job(self, job_row):
         """Process a job application with customized documents and follow-up"""
         job_title = job_row['Title']
@@ -410,14 +2929,74 @@ class JobApplicationManager:
         description = job_row['Description']
         
         print(f"\nProcessing application for {job_title} at {company}")
+        job_key = self.journal_key(job_row)
+        stages = self.store.journal([job_key]).get(job_key, {})
+        if 'record' in stages and 'reminder' in stages:
+            print(f"Application for {job_title} at {company} was already prepared, skipping")
+            return None
         
-        # Customize resume and cover letter
-        resume_path = self.document_customizer.customize_resume(job_title, company, description)
-        cover_letter_path = self.document_customizer.customize_cover_letter(job_title, company, description)
+        # Customize resume and cover letter, unless an earlier run already wrote them
+        documents = self._journaled_documents(stages)
+        if documents is None:
+            documents = (self.document_customizer.customize_resume(job_title, company, description, job_key),
+                         self.document_customizer.customize_cover_letter(job_title, company, description, job_key))
+            self.store.record_stage(job_key, 'documents', documents)
+        resume_path, cover_letter_path = documents
+        
+        new_application = self._follow_up_and_record(job_row, resume_path, cover_letter_path)
+        if new_application['FollowUp_Set']:
+            self.store.record_stage(job_key, 'reminder', 'created')
+        elif not self.calendar_manager.service:
+            self.store.record_stage(job_key, 'reminder', 'disabled')
+        if 'record' not in stages or job_key == job_row['URL']:
+            self.store.upsert('applied_jobs', [new_application])
+        self.store.record_stage(job_key, 'record')
+        
+        print(f"Application for {job_title} at {company} prepared successfully")
+        return new_application
+    
+    def pending_jobs(self, jobs):
+        """The rows of jobs not applied to yet: neither in applied_jobs nor finished in the journal"""
+        if not len(jobs):
+            return jobs
+        keys = [self.journal_key(job) for _, job in jobs.iterrows()]
+        journal = self.store.journal(keys)
+        applied = set(self.applied_jobs['URL'].dropna())
+        return jobs[[key not in applied and not ('record' in journal.get(key, {}) and 'reminder' in journal[key])
+                     for key in keys]]
+    
+    @staticmethod
+    def journal_key(job_row):
+        """Jobs are journaled by URL, or by title and company when the posting has none"""
+        if job_row['URL'] and job_row['URL'] != "N/A":
+            return job_row['URL']
+        return f"{job_row['Title']}|{job_row['Company']}"
+    
+    @staticmethod
+    def _journaled_documents(stages):
+        """Document paths from the journal, if they were written and are still in scratch or on Drive"""
+        documents = stages.get('documents')
+        output = get_output()
+        if documents and all(path and output.exists(path) for path in documents):
+            return tuple(documents)
+        return None
+    
+    def _follow_up_and_record(self, job_row, resume_path, cover_letter_path, queue_reminder=False):
+        """
+        Set (or, in a batch, queue) the follow-up reminder and build the application record
+        for one job. Queued records carry the reminder's event ID in FollowUp_Set until flushed.
+        """
+        job_title = job_row['Title']
+        company = job_row['Company']
         
         # Set follow-up reminder
         application_date = datetime.now()
-        follow_up_set = self.calendar_manager.set_follow_up_reminder(job_title, company, application_date)
+        if queue_reminder:
+            follow_up_set = self.calendar_manager.queue_follow_up_reminder(
+                job_title, company, application_date, job_url=job_row['URL'])
+        else:
+            follow_up_set = self.calendar_manager.set_follow_up_reminder(
+                job_title, company, application_date, job_url=job_row['URL'])
         
         # Record the application
         new_application = {
@@ -426,54 +3005,392 @@ class JobApplicationManager:
             'Location': job_row['Location'],
             'URL': job_row['URL'],
             'Application_Date': application_date.strftime("%Y-%m-%d"),
-            'Resume_Path': resume_path,
-            'CoverLetter_Path': cover_letter_path,
+            # Where the documents live once synced, not the scratch copies
+            'Resume_Path': get_output().destination(resume_path) if resume_path else resume_path,
+            'CoverLetter_Path': get_output().destination(cover_letter_path) if cover_letter_path else cover_letter_path,
             'FollowUp_Set': follow_up_set
         }
-        
-        self.applied_jobs = pd.concat([self.applied_jobs, pd.DataFrame([new_application])], ignore_index=True)
-        
-        print(f"Application for {job_title} at {company} prepared successfully")
         return new_application
     
-    def batch_process_jobs(self, num_jobs=5):
-        """Process multiple job applications in batch"""
-        filtered_jobs = self.job_retriever.filter_jobs()
+    def resume_text(self):
+        """Plain text of the resume template, usable as a relevance profile"""
+        return self.document_customizer.resume_text()
+    
+    @timed('batch')
+    def batch_process_jobs(self, num_jobs=5, workers=None, rank_by_resume=False, resume=True, jobs=None,
+                           pool=None, sync=True):
+        """
+        Process multiple job applications in batch.
+        Documents are generated on a process pool (workers defaults to every core,
+        workers=1 keeps everything in this process); reminders and records stay in job order.
+        With rank_by_resume, the jobs most relevant to the resume template are processed.
+        jobs (a DataFrame already selected, e.g. routed to a profile) skips the filtering,
+        and pool is an existing process pool to use instead of starting one.
+        Every finished stage is journaled in the JobStore, so re-running an interrupted
+        batch skips the work already done; resume=False redoes every job.
+        Output goes to local scratch and is synced to Drive in the background (sync=False
+        leaves syncing to the caller). Returns (applications, failures).
+        """
+        if jobs is not None:
+            filtered_jobs = jobs
+        elif rank_by_resume:
+            filtered_jobs = self.job_retriever.filter_jobs(profile_text=self.resume_text(), top_k=num_jobs)
+        else:
+            filtered_jobs = self.job_retriever.filter_jobs()
         
         if len(filtered_jobs) == 0:
             print("No jobs found matching your criteria")
-            return
+            return [], []
         
         # Process the top N jobs
         jobs_to_process = filtered_jobs.head(num_jobs)
         
-        for _, job in jobs_to_process.iterrows():
-            self.apply_to_job(job)
+        # One keyword model over every stored description, shared by all customizations
+        self.document_customizer.fit_keywords(self.job_retriever.jobs_df['Description'])
+        
+        workers = workers or os.cpu_count() or 1
+        output = get_output()
+        if sync:
+            output.begin_batch()
+        result = self._process_batch(jobs_to_process, workers, resume, pool)
         
-        # Save the applied jobs record
+        # Save the applied jobs record, then hand everything to the Drive sync without waiting on it
         self.save_applied_jobs()
+        if sync:
+            output.sync(wait=False)
+        return result
+    
+    def _process_batch(self, jobs_to_process, workers, resume=True, pool=None):
+        """
+        Generate documents (on a process pool when workers > 1, or on `pool` when given)
+        and queue each job's reminder as soon as its documents exist. Reminders are sent in
+        batched Calendar calls of up to BATCH_LIMIT, and each record is saved once its reminder
+        is settled. Each stage goes into the journal as it completes.
+        """
+        customizer = self.document_customizer
+        jobs = [job for _, job in jobs_to_process.iterrows()]
+        keys = [self.journal_key(job) for job in jobs]
+        journal = self.store.journal(keys) if resume else {}
+        recorded = {key for key in keys if 'record' in journal.get(key, {})}
+        
+        # Finished jobs are skipped outright; documents that were already written are reused
+        todo = []
+        for job, key in zip(jobs, keys):
+            stages = journal.get(key, {})
+            if 'record' in stages and 'reminder' in stages:
+                continue
+            todo.append((job, key, self._journaled_documents(stages)))
+        skipped = len(jobs) - len(todo)
+        to_generate = [job for job, _, documents in todo if documents is None]
+        if skipped or len(to_generate) < len(todo):
+            print(f"Resuming batch: {skipped} of {len(jobs)} jobs already done, "
+                  f"documents reused for {len(todo) - len(to_generate)} more")
+        
+        workers = min(workers, len(to_generate))
+        futures = {}
+        own_pool = None
+        if to_generate and (pool is not None or workers > 1):
+            if pool is None:
+                print(f"\nGenerating documents for {len(to_generate)} jobs on {workers} workers")
+                pool = own_pool = document_pool(workers)
+            templates = (customizer.resume_path, customizer.cover_letter_path, customizer.output_subdir)
+            forked = isinstance(pool, ProcessPoolExecutor)
+            futures = {index: pool.submit(_customize_documents, templates, job['Title'], job['Company'],
+                                          job['Description'], customizer.extract_job_keywords(job['Description']), key)
+                       if forked else pool.submit(self._generate_documents, customizer, job, key)
+                       for index, (job, key, documents) in enumerate(todo) if documents is None}
+        
+        applications = []
+        unsettled = []
+        failures = []
+        try:
+            # Reminders and records are handled in job order as each job's documents finish
+            for index, (job, key, documents) in enumerate(todo):
+                progress = f"[{index + 1}/{len(todo)}] {job['Title']} at {job['Company']}"
+                job_started = time.perf_counter()
+                if documents is None:
+                    try:
+                        if index in futures:
+                            documents = futures[index].result()
+                            if forked:
+                                # Worker processes only write the files; they are registered for sync here
+                                get_output().add(*documents)
+                        else:
+                            documents = self._generate_documents(customizer, job, key)
+                    except Exception as e:
+                        failures.append((job['URL'], str(e)))
+                        metrics.incr('batch.failed')
+                        print(f"{progress}: document generation failed: {str(e)}")
+                        continue
+                    self.store.record_stage(key, 'documents', documents)
+                
+                application = self._follow_up_and_record(job, *documents, queue_reminder=True)
+                applications.append(application)
+                unsettled.append((key, application))
+                if len(unsettled) >= self.calendar_manager.BATCH_LIMIT:
+                    self._settle_reminders(unsettled, recorded)
+                    unsettled = []
+                # Time from the job's turn until its documents are ready (waiting on the pool included)
+                metrics.timing('stage.batch_job', (time.perf_counter() - job_started) * 1000)
+                print(f"{progress}: prepared")
+        finally:
+            if own_pool is not None:
+                own_pool.shutdown()
+        self._settle_reminders(unsettled, recorded)
+        
+        metrics.incr('batch.prepared', len(applications))
+        print(f"Batch complete: {len(applications)} prepared, {len(failures)} failed, {skipped} already done")
+        return applications, failures
+    
+    @staticmethod
+    def _generate_documents(customizer, job, key):
+        return (customizer.customize_resume(job['Title'], job['Company'], job['Description'], key),
+                customizer.customize_cover_letter(job['Title'], job['Company'], job['Description'], key))
+    
+    def _settle_reminders(self, unsettled, recorded=()):
+        """Send queued reminders in one batched call, then journal and record each outcome"""
+        if not unsettled:
+            return
+        reminder_results = self.calendar_manager.flush_reminders()
+        for key, application in unsettled:
+            outcome = reminder_results.get(application['FollowUp_Set'])
+            application['FollowUp_Set'] = outcome in ('created', 'exists')
+            # Failed reminders stay out of the journal, so the next run retries them; without a
+            # calendar there is nothing to retry, so the job is done once it is recorded
+            if application['FollowUp_Set'] or outcome == 'disabled':
+                self.store.record_stage(key, 'reminder', outcome)
+        # One write per record, with FollowUp_Set final. URL-less rows never match on conflict, so
+        # one that an earlier run already stored is not written again
+        self.store.upsert('applied_jobs', [application for key, application in unsettled
+                                           if key not in recorded or key == application['URL']])
+        for key, _ in unsettled:
+            self.store.record_stage(key, 'record')
     
     def save_applied_jobs(self, filename='applied_jobs.csv'):
         """Save the record of applied jobs"""
-        path = '/content/drive/My Drive/' + filename
-        self.applied_jobs.to_csv(path, index=False)
-        print(f"Saved record of {len(self.applied_jobs)} applications to {path}")
+        output = get_output()
+        path = output.path(os.path.join(self.output_subdir, filename))
+        applied_jobs = self.applied_jobs
+        applied_jobs.to_csv(path, index=False)
+        output.add(path)
+        print(f"Saved record of {len(applied_jobs)} applications to {path}")
         return path
 
+# 5. Headless Multi-profile Runner
+class MultiProfileRunner:
+    """
+    Runs several application profiles (each with its own templates, keywords,
+    locations and num_jobs) in one process, e.g. from cron. The profiles share
+    one planned search sweep and one scraped corpus, one keyword model fitted on
+    it, one process pool for document generation (templates loaded once, before
+    the fork) and one Drive sync; each keeps its applications and journal in its
+    own store under state_dir and writes into its own output folder. Batches run
+    concurrently, max_concurrent_profiles at a time, and a report is printed and
+    saved per profile. Calendar reminders never prompt: a profile without a
+    usable token (calendar_token) just skips them.
+
+    Config (JSON):
+        {"store": ".../jobs.db", "http_cache": ".../http_cache.db", "state_dir": "...",
+         "sources": ["indeed", "linkedin"], "locations": ["Remote"], "num_jobs": 3,
+         "workers": 4, "max_concurrent_profiles": 4, "incremental": true, "archive": false,
+         "profiles": [{"name": "security", "resume": "Resume.docx", "cover_letter": "Cover.docx",
+                       "keywords": "cybersecurity CISSP", "locations": ["New York, NY"],
+                       "num_jobs": 5, "min_keywords_match": 2, "rank_by_resume": false,
+                       "calendar_token": "security_token.pickle"}]}
+    """
+    REPORT_FILE = 'run_report.json'
+    
+    def __init__(self, config, calendar_api_root=None):
+        self.config = dict(config)
+        if not self.config.get('profiles'):
+            raise ValueError("config has no profiles")
+        names = [profile.get('name') for profile in self.config['profiles']]
+        if not all(names) or len(set(names)) != len(names):
+            raise ValueError("every profile needs a unique name")
+        self.calendar_api_root = calendar_api_root
+        self.sources = tuple(self.config.get('sources', ('indeed', 'linkedin')))
+        self.locations = self.config.get('locations') or []
+        self.profiles = {profile['name']: profile for profile in self.config['profiles']}
+        
+        # The corpus every profile searches, and the keyword model fitted on it
+        store_path = self.config.get('store', os.path.join(DRIVE_DIR, "job_cache", "jobs.db"))
+        cache_path = self.config.get('http_cache')
+        self.store = JobStore(store_path)
+        self.job_retriever = JobRetriever(store=self.store, base_urls=self.config.get('base_urls'),
+                                          cache=ResponseCache(cache_path) if cache_path else None,
+                                          incremental=self.config.get('incremental', True))
+        self.keyword_extractor = KeywordExtractor()
+        self.planner = QueryPlanner()
+        
+        state_dir = self.config.get('state_dir', os.path.join(os.path.dirname(store_path) or '.', 'profiles'))
+        self.managers = {}
+        for name, profile in self.profiles.items():
+            # Applications and the batch journal are per profile; an in-memory corpus keeps them in memory too
+            profile_store = JobStore(':memory:' if store_path == ':memory:' else
+                                     os.path.join(state_dir, f"{self.folder(name)}.db"))
+            calendar_options = {'interactive': False}
+            if profile.get('calendar_token'):
+                calendar_options['token_path'] = profile['calendar_token']
+            self.managers[name] = JobApplicationManager(
+                profile['resume'], profile['cover_letter'], store=profile_store,
+                calendar_api_root=calendar_api_root, job_retriever=self.job_retriever,
+                keyword_extractor=self.keyword_extractor, output_subdir=self.folder(name),
+                calendar_options=calendar_options)
+        self.report = {}
+    
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """Load a JSON config; relative template, token and database paths are taken from the config's folder"""
+        with open(path, encoding='utf-8') as f:
+            config = json.load(f)
+        base = os.path.dirname(os.path.abspath(path))
+        
+        def resolve(value):
+            return value if not value or value == ':memory:' else os.path.join(base, os.path.expanduser(value))
+        
+        for key in ('store', 'http_cache', 'state_dir'):
+            if key in config:
+                config[key] = resolve(config[key])
+        for profile in config.get('profiles', []):
+            for key in ('resume', 'cover_letter', 'calendar_token'):
+                if key in profile:
+                    profile[key] = resolve(profile[key])
+        return cls(config, **kwargs)
+    
+    @staticmethod
+    def folder(name):
+        """Output folder / state file name for a profile"""
+        return re.sub(r'[^A-Za-z0-9_.-]+', '_', name).strip('._') or 'profile'
+    
+    def search(self):
+        """One planned sweep for every profile, then {name: the jobs it will process}"""
+        planned = {name: {'keywords': profile['keywords'], 'locations': profile.get('locations'),
+                          'min_keywords_match': profile.get('min_keywords_match', 2)}
+                   for name, profile in self.profiles.items()}
+        queries = self.planner.plan(planned, self.locations, self.sources)
+        self.job_retriever.search(queries)
+        routed = self.planner.route(self.job_retriever, planned, self.locations)
+        
+        selected = {}
+        for name, profile in self.profiles.items():
+            jobs = routed[name]
+            num_jobs = profile.get('num_jobs', self.config.get('num_jobs', 3))
+            if profile.get('rank_by_resume') and len(jobs):
+                # Best resume matches among the postings routed to this profile
+                resume_text = self.managers[name].resume_text()
+                ranked = self.job_retriever.rank_jobs(resume_text, top_k=len(self.job_retriever.jobs_df)).index
+                jobs = jobs.loc[[job_id for job_id in ranked if job_id in jobs.index]]
+            # Jobs this profile already applied to would only be skipped by the batch, so num_jobs
+            # counts the new ones
+            pending = self.managers[name].pending_jobs(jobs)
+            selected[name] = pending.head(num_jobs)
+            self.report[name] = {'matched': len(routed[name]), 'selected': len(selected[name]),
+                                 'already_done': len(jobs) - len(pending)}
+        return selected
+    
+    def _run_profile(self, name, jobs, workers, pool):
+        started = time.perf_counter()
+        report = self.report[name]
+        try:
+            applications, failures = self.managers[name].batch_process_jobs(
+                num_jobs=len(jobs), workers=workers, jobs=jobs, pool=pool, sync=False)
+            report.update(prepared=len(applications), failed=len(failures),
+                          reminders=sum(1 for application in applications if application['FollowUp_Set']),
+                          already_done=report['already_done'] + len(jobs) - len(applications) - len(failures))
+        except Exception as e:
+            report['error'] = str(e)
+            print(f"Profile {name} failed: {str(e)}")
+        report['seconds'] = round(time.perf_counter() - started, 2)
+        metrics.timing('stage.profile', report['seconds'] * 1000)
+    
+    @timed('run_profiles')
+    def run(self):
+        """Search, then prepare every profile's applications; returns {name: report}"""
+        started = time.perf_counter()
+        output = get_output()
+        output.begin_batch()
+        selected = self.search()
+        
+        # Fit the shared keyword model and load every template set before the pool forks
+        self.keyword_extractor.fit(self.job_retriever.jobs_df['Description'])
+        for name, manager in self.managers.items():
+            if len(selected[name]):
+                manager.document_customizer
+        
+        workers = self.config.get('workers') or os.cpu_count() or 1
+        total = sum(len(jobs) for jobs in selected.values())
+        pool = None
+        if workers > 1 and total > 1:
+            print(f"\nGenerating documents for {len(selected)} profiles on {workers} workers")
+            pool = document_pool(min(workers, total))
+            # Fork the workers now, while this is the only thread touching shared state
+            pool.submit(os.getpid).result()
+        try:
+            concurrent = self.config.get('max_concurrent_profiles') or len(selected)
+            with ThreadPoolExecutor(max_workers=concurrent, thread_name_prefix='profile') as profiles:
+                for name, jobs in selected.items():
+                    if len(jobs):
+                        profiles.submit(self._run_profile, name, jobs, workers, pool)
+                    else:
+                        self.report[name].update(prepared=0, failed=0, reminders=0, seconds=0.0)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        
+        self.print_report(time.perf_counter() - started)
+        path = output.path(self.REPORT_FILE)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'finished': datetime.now().isoformat(timespec='seconds'), 'search': self.planner.stats,
+                       'profiles': self.report}, f, indent=1)
+        output.add(path)
+        return self.report
+    
+    def print_report(self, seconds):
+        print(f"\nRun report ({len(self.report)} profiles, {seconds:.1f}s, "
+              f"{self.planner.stats.get('pages', 0)} pages planned):")
+        print(f"{'profile':<24}{'matched':>8}{'selected':>9}{'prepared':>9}{'failed':>7}"
+              f"{'done':>6}{'reminders':>10}{'seconds':>9}")
+        for name, report in self.report.items():
+            print(f"{name[:23]:<24}{report['matched']:>8}{report['selected']:>9}{report.get('prepared', 0):>9}"
+                  f"{report.get('failed', 0):>7}{report.get('already_done', 0):>6}{report.get('reminders', 0):>10}"
+                  f"{report.get('seconds', 0):>9}" + (f"  error: {report['error']}" if 'error' in report else ''))
+
+
+def run_profiles(config_path, **kwargs):
+    """Headless entry point (e.g. cron): run every profile in a config file and sync the output"""
+    configure_metrics()
+    runner = MultiProfileRunner.from_file(config_path, **kwargs)
+    if runner.config.get('archive'):
+        configure_output(archive=True)
+    try:
+        return runner.run()
+    finally:
+        # Wait for the documents and the report to reach Drive before the process exits
+        get_output().close()
+        metrics.flush()
+
 # Example usage
 def run_job_application_system():
     # File paths (update these with your actual file paths)
-    resume_path = "/content/drive/My Drive/Resume_Template.docx"
-    cover_letter_path = "/content/drive/My Drive/Cover_Letter_Template.docx"
+    resume_path = os.path.join(DRIVE_DIR, "Resume_Template.docx")
+    cover_letter_path = os.path.join(DRIVE_DIR, "Cover_Letter_Template.docx")
+    
+    # Stage timings and counters go to StatsD when TELEGRAF_HOST is set (e.g. the f(log) stack)
+    configure_metrics()
+    
+    # Initialize the job application manager; jobs and applications persist in SQLite between runs
+    store = JobStore(os.path.join(DRIVE_DIR, "job_cache", "jobs.db"))
+    manager = JobApplicationManager(resume_path, cover_letter_path, store=store)
     
-    # Initialize the job application manager
-    manager = JobApplicationManager(resume_path, cover_letter_path)
+    # Re-runs serve recent pages from the on-disk cache (pass replay_only=True to work offline)
+    manager.job_retriever.fetcher.cache = ResponseCache(os.path.join(DRIVE_DIR, "job_cache", "http_cache.db"))
     
     # Search for jobs
     job_keywords = "cybersecurity IT project management CISSP PMP"
     locations = ["New York, NY", "Remote"]
     
-    jobs_found = manager.search_jobs(job_keywords, locations)
+    # Standing search: later runs only page through postings the stored high-water mark has not seen
+    jobs_found = manager.search_jobs(job_keywords, locations, incremental=True)
     
     # Display found jobs
     print("\nTop matching jobs:")
@@ -482,8 +3399,22 @@ def run_job_application_system():
     
     # Process applications for top 3 jobs
     manager.batch_process_jobs(num_jobs=3)
+    # Documents were written locally; wait for the last of them to reach Drive
+    get_output().close()
+    metrics.flush()
     
     print("\nJob application automation completed!")
 
 # Run the system
-run_job_application_system()
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Job application automation")
+    parser.add_argument('--profiles', help="JSON config of profiles to run headless (e.g. from cron)")
+    parser.add_argument('--no-install', action='store_true', help="skip installing packages at startup")
+    # Notebook kernels pass their own arguments, which are ignored
+    args, _ = parser.parse_known_args()
+    bootstrap(install_packages=not args.no_install)
+    if args.profiles:
+        run_profiles(args.profiles)
+    else:
+        run_job_application_system()
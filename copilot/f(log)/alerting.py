@@ -0,0 +1,348 @@
+import gzip
+import json
+import operator
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+
+OPERATORS = {'>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le,
+             '==': operator.eq, '!=': operator.ne}
+AGGREGATES = ('max', 'min', 'avg', 'sum', 'count')
+KINDS = ('threshold', 'count', 'rate')
+TIME_FIELDS = ('@timestamp', 'timestamp', 'time')
+INF = float('inf')
+
+
+def event_time(event, default=None):
+    """Event time in epoch seconds from @timestamp/timestamp/time (epoch s/ms/ns or ISO 8601)"""
+    for field in TIME_FIELDS:
+        value = event.get(field)
+        if value is None:
+            continue
+        if isinstance(value, (int, float)):
+            # Line-protocol style nanoseconds and JavaScript milliseconds are common in logs
+            if value > 1e17:
+                return value / 1e9
+            if value > 1e11:
+                return value / 1e3
+            return float(value)
+        try:
+            return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            continue
+    return time.time() if default is None else default
+
+
+class SlidingWindow:
+    """
+    Fixed-memory sliding window: a ring of `buckets` slots, each covering
+    width/buckets seconds, holding count, sum, min and max of the values that
+    fell into it. Adding an event only touches its slot (and clears slots the
+    window has moved past), so nothing is ever re-scanned. Resolution is one slot.
+    """
+    __slots__ = ('slot_width', 'size', 'counts', 'sums', 'mins', 'maxs', 'head', 'count', 'total')
+
+    def __init__(self, width, buckets):
+        self.slot_width = width / buckets
+        self.size = buckets
+        self.counts = [0] * buckets
+        self.sums = [0.0] * buckets
+        self.mins = [INF] * buckets
+        self.maxs = [-INF] * buckets
+        self.head = None
+        self.count = 0
+        self.total = 0.0
+
+    def _clear(self, position):
+        self.count -= self.counts[position]
+        self.total -= self.sums[position]
+        self.counts[position] = 0
+        self.sums[position] = 0.0
+        self.mins[position] = INF
+        self.maxs[position] = -INF
+
+    def advance(self, timestamp):
+        """Move the window's leading edge to timestamp, expiring the slots it passed"""
+        slot = int(timestamp // self.slot_width)
+        if self.head is None:
+            self.head = slot
+        elif slot > self.head:
+            for expired in range(self.head + 1, min(slot, self.head + self.size) + 1):
+                self._clear(expired % self.size)
+            self.head = slot
+        return slot
+
+    def add(self, timestamp, value=1.0):
+        slot = self.advance(timestamp)
+        if slot <= self.head - self.size:
+            return False   # older than the whole window
+        position = slot % self.size
+        self.counts[position] += 1
+        self.sums[position] += value
+        if value < self.mins[position]:
+            self.mins[position] = value
+        if value > self.maxs[position]:
+            self.maxs[position] = value
+        self.count += 1
+        self.total += value
+        return True
+
+    def aggregate(self, name):
+        if name == 'count':
+            return self.count
+        if name == 'sum':
+            return self.total
+        if name == 'avg':
+            return self.total / self.count if self.count else 0.0
+        if name == 'max':
+            return max(self.maxs)
+        return min(self.mins)
+
+
+class Rule:
+    """
+    One alert rule. kind is 'threshold' (aggregate of a numeric field), 'count'
+    (matching events) or 'rate' (matching events per second), each computed per
+    value of `key` over a sliding window of `window` seconds and compared with
+    `value` using `op`. `match` restricts the rule to events whose fields equal
+    the given values. A rule fires at most once per key per `cooldown` seconds.
+    """
+
+    def __init__(self, name, kind='count', window=60, op='>', value=0, match=None, key=None, field=None,
+                 aggregate='max', cooldown=None, buckets=60, max_keys=10000):
+        if kind not in KINDS:
+            raise ValueError(f'kind must be one of {", ".join(KINDS)}')
+        if op not in OPERATORS:
+            raise ValueError(f'op must be one of {" ".join(OPERATORS)}')
+        if kind == 'threshold':
+            if not field:
+                raise ValueError('threshold rules need a field')
+            if aggregate not in AGGREGATES:
+                raise ValueError(f'aggregate must be one of {", ".join(AGGREGATES)}')
+        if float(window) <= 0:
+            raise ValueError('window must be positive')
+        if int(buckets) < 1:
+            raise ValueError('buckets must be a positive integer')
+        if int(max_keys) < 1:
+            raise ValueError('max_keys must be a positive integer')
+        self.name = name
+        self.kind = kind
+        self.window = float(window)
+        self.op = op
+        self.value = float(value)
+        self.match = dict(match or {})
+        self.key = key
+        self.field = field
+        self.aggregate = aggregate if kind == 'threshold' else 'count'
+        self.cooldown = self.window if cooldown is None else float(cooldown)
+        self.buckets = int(buckets)
+        self.max_keys = int(max_keys)
+
+        # Compiled once: the comparison, the match test and the per-key state
+        self._compare = OPERATORS[op]
+        self._match_items = tuple(self.match.items())
+        self._scale = 1.0 / self.window if kind == 'rate' else 1.0
+        self.windows = OrderedDict()
+        self.last_fired = {}
+
+    @classmethod
+    def from_spec(cls, spec, **defaults):
+        """Build a rule from a JSON/form dict; match may be a dict or 'field=value,field=value'"""
+        spec = dict(spec)
+        match = spec.pop('match', None)
+        if isinstance(match, str):
+            match = {field.strip(): _literal(value.strip())
+                     for field, value in (part.split('=', 1) for part in match.split(',') if '=' in part)}
+        options = {name: spec[name] for name in ('kind', 'window', 'op', 'value', 'key', 'field', 'aggregate',
+                                                 'cooldown', 'buckets', 'max_keys') if spec.get(name) not in (None, '')}
+        if not spec.get('name'):
+            raise ValueError('rules need a name')
+        return cls(spec['name'], match=match, **{**defaults, **options})
+
+    def to_dict(self):
+        return {'name': self.name, 'kind': self.kind, 'window': self.window, 'op': self.op, 'value': self.value,
+                'match': self.match, 'key': self.key, 'field': self.field, 'aggregate': self.aggregate,
+                'cooldown': self.cooldown, 'buckets': self.buckets, 'max_keys': self.max_keys}
+
+    def matches(self, event):
+        for field, expected in self._match_items:
+            if event.get(field) != expected:
+                return False
+        return True
+
+    def observe(self, event, timestamp):
+        """Fold one matching event into its key's window; return an alert dict if the rule fires"""
+        if self.kind == 'threshold':
+            value = event.get(self.field)
+            if not isinstance(value, (int, float)):
+                try:
+                    value = float(value)
+                except (TypeError, ValueError):
+                    return None
+        else:
+            value = 1.0
+        key = event.get(self.key) if self.key else None
+        window = self.windows.get(key)
+        if window is None:
+            # Bounded state: the least recently seen key is dropped first
+            if len(self.windows) >= self.max_keys:
+                old_key, _ = self.windows.popitem(last=False)
+                self.last_fired.pop(old_key, None)
+            window = self.windows[key] = SlidingWindow(self.window, self.buckets)
+        else:
+            self.windows.move_to_end(key)
+        if not window.add(timestamp, value):
+            return None
+
+        observed = window.aggregate(self.aggregate) * self._scale
+        if not self._compare(observed, self.value):
+            return None
+        last = self.last_fired.get(key)
+        if last is not None and timestamp - last < self.cooldown:
+            return None
+        self.last_fired[key] = timestamp
+        return {'rule': self.name, 'kind': self.kind, 'key': key, 'value': observed, 'op': self.op,
+                'threshold': self.value, 'window': self.window, 'time': timestamp}
+
+    def reset(self):
+        self.windows.clear()
+        self.last_fired.clear()
+
+
+class EvaluationPlan:
+    """
+    Rules indexed for dispatch: each rule with a match filter is filed under one
+    (field, value) pair, so an event only visits the rules whose first filter it
+    already satisfies, plus the rules without any filter.
+    """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self.index = {}
+        self.unfiltered = []
+        for rule in self.rules:
+            if rule.match:
+                field, value = next(iter(rule.match.items()))
+                self.index.setdefault(field, {}).setdefault(value, []).append(rule)
+            else:
+                self.unfiltered.append(rule)
+
+    def candidates(self, event):
+        candidates = list(self.unfiltered)
+        for field, by_value in self.index.items():
+            value = event.get(field)
+            if value is not None:
+                try:
+                    candidates.extend(by_value.get(value, ()))
+                except TypeError:
+                    pass   # unhashable field value, cannot match an equality filter
+        return candidates
+
+
+class AlertEngine:
+    """
+    Evaluates rules incrementally over an event stream. process() runs each
+    event against the compiled plan and returns the alerts it triggered; alerts
+    are also passed to on_alert and kept in a bounded recent-alerts list.
+    """
+
+    def __init__(self, rules=(), on_alert=None, keep_alerts=1000, buckets=60, max_keys=10000):
+        self.defaults = {'buckets': buckets, 'max_keys': max_keys}
+        self.rules = OrderedDict()
+        self.on_alert = on_alert
+        self.alerts = deque(maxlen=keep_alerts)
+        self.lock = threading.Lock()
+        self.stats = {'events': 0, 'alerts': 0}
+        self.plan = EvaluationPlan(())
+        for rule in rules:
+            self.add_rule(rule)
+
+    def add_rule(self, rule):
+        """Add (or replace, by name) a Rule or rule spec dict and recompile the plan"""
+        if not isinstance(rule, Rule):
+            rule = Rule.from_spec(rule, **self.defaults)
+        with self.lock:
+            self.rules[rule.name] = rule
+            self.plan = EvaluationPlan(self.rules.values())
+        return rule
+
+    def remove_rule(self, name):
+        with self.lock:
+            removed = self.rules.pop(name, None)
+            self.plan = EvaluationPlan(self.rules.values())
+        return removed is not None
+
+    def process(self, event, timestamp=None):
+        if timestamp is None:
+            timestamp = event_time(event)
+        fired = []
+        with self.lock:
+            self.stats['events'] += 1
+            for rule in self.plan.candidates(event):
+                if rule.matches(event):
+                    alert = rule.observe(event, timestamp)
+                    if alert is not None:
+                        fired.append(alert)
+            if fired:
+                self.stats['alerts'] += len(fired)
+                self.alerts.extend(fired)
+        if fired and self.on_alert:
+            for alert in fired:
+                self.on_alert(alert)
+        return fired
+
+    def process_ndjson(self, body):
+        """Evaluate every JSON object line of an NDJSON body; malformed lines are skipped"""
+        fired = []
+        for line in body.split(b'\n'):
+            if line.strip():
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(event, dict):
+                    fired.extend(self.process(event))
+        return fired
+
+    def recent_alerts(self, limit=100):
+        with self.lock:
+            return list(self.alerts)[-limit:]
+
+    def replay(self, path, progress=None, limit=10000):
+        """
+        Evaluate the current rules over a stored NDJSON log file (optionally .gz)
+        in event-time order of the file, on fresh window state so the live engine
+        is untouched. Returns {'events', 'alerts', 'fired'} with up to limit alerts.
+        """
+        with self.lock:
+            specs = [rule.to_dict() for rule in self.rules.values()]
+        engine = AlertEngine([Rule.from_spec(spec, **self.defaults) for spec in specs], keep_alerts=limit)
+        compressed = path.endswith('.gz')
+        # Progress is by bytes read; gzip positions are in uncompressed bytes, so none there
+        size = None if compressed else os.path.getsize(path)
+        total = 0
+        with (gzip.open if compressed else open)(path, 'rb') as log_file:
+            for line_number, line in enumerate(log_file, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(event, dict):
+                    # Without a timestamp the line number keeps replays deterministic
+                    total += len(engine.process(event, event_time(event, default=float(line_number))))
+                if progress and size and line_number % 50000 == 0:
+                    progress(min(99, 100 * log_file.tell() // size), f'{line_number} lines replayed')
+        return {'events': engine.stats['events'], 'alerts': total, 'fired': list(engine.alerts)}
+
+
+def _literal(text):
+    """'500' -> 500, 'true' -> True, anything else stays a string"""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
@@ -1,37 +1,220 @@
-from flask import Flask, request, render_template
+import os
+import time
+
+from flask import Flask, Response, jsonify, request, render_template, url_for
 from llm_agent import LLM_Agent
+from alerting import AlertEngine
+from ingest import Backpressure, Ingestor, PayloadTooLarge
+from monitoring import MetricRollups, parse_range, parse_time
+from tasks import QueueFull, TaskQueue
 
 app = Flask(__name__)
 
 # Initialize the LLM Agent
 agent = LLM_Agent()
 
+# Long-running setup jobs run here instead of inside the request
+task_queue = TaskQueue(max_workers=int(os.environ.get('TASK_WORKERS', 4)),
+                       max_pending=int(os.environ.get('TASK_QUEUE_SIZE', 64)))
+
+def run_siem_setup(form_data, progress):
+    progress(5, 'Provisioning SIEM')
+    return agent.setup_siem(form_data)
+
+def submit_task(kind, func, *args):
+    """Queue a job and answer 202 with its task ID, or 503 when the queue is full"""
+    try:
+        task_id = task_queue.submit(kind, func, *args)
+    except QueueFull as e:
+        response = jsonify({'error': str(e)})
+        response.status_code = 503
+        response.headers['Retry-After'] = '5'
+        return response
+    response = jsonify({
+        'task_id': task_id,
+        'message': f'{kind} in progress...',
+        'status_url': url_for('task_status', task_id=task_id),
+        'events_url': url_for('task_events', task_id=task_id),
+    })
+    response.status_code = 202
+    response.headers['Location'] = url_for('task_status', task_id=task_id)
+    return response
+
 @app.route('/', methods=['GET', 'POST'])
 def index():
     if request.method == 'POST':
-        # Process form data
-        form_data = request.form
-        agent.setup_siem(form_data)
-        return 'SIEM setup in progress...'
+        # Process form data; copy it so the task does not hold on to the request
+        form_data = request.form.copy()
+        return submit_task('SIEM setup', run_siem_setup, form_data)
     return render_template('index.html')
 
+@app.route('/tasks')
+def task_list():
+    return jsonify(task_queue.list())
+
+@app.route('/tasks/<task_id>')
+def task_status(task_id):
+    task = task_queue.get(task_id)
+    if task is None:
+        return jsonify({'error': 'unknown task'}), 404
+    return jsonify(task)
+
+@app.route('/tasks/<task_id>/events')
+def task_events(task_id):
+    if task_queue.get(task_id) is None:
+        return jsonify({'error': 'unknown task'}), 404
+    # Browsers resend the last event ID they saw when an EventSource reconnects
+    last_event_id = request.headers.get('Last-Event-ID', request.args.get('after', '0'))
+    last_event_id = int(last_event_id) if last_event_id.isdigit() else 0
+    return Response(task_queue.stream(task_id, last_event_id), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+# Batched writes to the Elasticsearch and InfluxDB services of docker-compose.yml
+ingestor = Ingestor.from_env()
+# Werkzeug answers 413 before reading a larger body; decode() applies the same cap after gunzip
+app.config['MAX_CONTENT_LENGTH'] = ingestor.max_body_bytes
+
+def ingest(handler):
+    """Run an Ingestor handler on the request body and map its outcome to a response"""
+    try:
+        body = ingestor.decode(request.get_data(), request.headers.get('Content-Encoding'))
+        # Without a sink the lines are only checked; alert rules and rollups below still see them
+        if handler == ingestor.ingest_logs and ingestor.logs is None:
+            documents, _, rejected = ingestor.parse_logs(body)
+            accepted = len(documents)
+        elif handler == ingestor.ingest_metrics and ingestor.metrics is None:
+            points, _, rejected = ingestor.parse_metrics(body)
+            accepted = len(points)
+        else:
+            accepted, rejected = handler(body)
+        if handler == ingestor.ingest_metrics:
+            # Dashboards read the rollups, never the raw points; a body the sink refused is not counted
+            rollups.record_line_protocol(body)
+        if handler == ingestor.ingest_logs and alert_engine.rules:
+            # Rules see each event as it arrives, before it is even written out
+            evaluate_alerts(body)
+    except Backpressure as e:
+        response = jsonify({'error': str(e)})
+        response.status_code = 429
+        response.headers['Retry-After'] = '1'
+        return response
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 503
+    except PayloadTooLarge as e:
+        return jsonify({'error': str(e)}), 413
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'accepted': accepted, 'rejected': rejected}), 202
+
+def evaluate_alerts(body):
+    # The events are already accepted, so a failing rule is logged rather than failing the request
+    try:
+        alert_engine.process_ndjson(body)
+    except Exception:
+        app.logger.exception('Alert evaluation failed')
+
+@app.route('/ingest/logs', methods=['POST'])
+def ingest_logs():
+    # Newline-delimited JSON, one log event per line
+    return ingest(ingestor.ingest_logs)
+
+@app.route('/ingest/metrics', methods=['POST'])
+def ingest_metrics():
+    # InfluxDB line protocol, one point per line
+    return ingest(ingestor.ingest_metrics)
+
+@app.route('/ingest/stats')
+def ingest_stats():
+    return jsonify(ingestor.stats())
+
+# Rolling 1s/1m/1h aggregates of every metric series, for dashboard queries
+rollups = MetricRollups(max_series=int(os.environ.get('MONITORING_MAX_SERIES', 100)))
+
 @app.route('/monitoring', methods=['GET', 'POST'])
 def monitoring():
     if request.method == 'POST':
-        # Process monitoring form data
-        monitoring_data = request.form
-        # Implement monitoring setup logic here
-        return 'Monitoring setup in progress...'
+        # Points as JSON ({"series", "value", "time"} or a list of them) or line protocol
+        points = request.get_json(silent=True)
+        if points is None:
+            recorded = rollups.record_line_protocol(request.get_data())
+        else:
+            try:
+                recorded = 0
+                for point in points if isinstance(points, list) else [points]:
+                    recorded += rollups.record(point['series'], [parse_time(point.get('time'), time.time())],
+                                               [float(point['value'])])
+            except (KeyError, TypeError, ValueError) as e:
+                return jsonify({'error': f'bad point: {e}'}), 400
+        return jsonify({'recorded': recorded}), 202
     return render_template('monitoring.html')
 
+@app.route('/monitoring/series')
+def monitoring_series():
+    return jsonify({'series': rollups.list_series(), 'stats': rollups.stats, 'memory_bytes': rollups.memory_bytes()})
+
+@app.route('/monitoring/query')
+def monitoring_query():
+    # ?series=cpu.usage_idle&range=30d (or start/end, epoch seconds or ISO 8601)&points=500&stat=p95
+    args = request.args
+    try:
+        end = parse_time(args.get('end'), time.time())
+        start = end - parse_range(args['range']) if args.get('range') else parse_time(args.get('start'))
+        result = rollups.query(args.get('series', ''), start, end, points=min(int(args.get('points', 500)), 5000),
+                               stat=args.get('stat', 'mean'))
+    except KeyError:
+        return jsonify({'error': 'unknown series'}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(result)
+
+# Streaming alert rules, evaluated on every event posted to /ingest/logs
+alert_engine = AlertEngine()
+# Stored log files that /alerting/replay may read; nothing outside this directory is served
+replay_log_dir = os.path.realpath(os.environ.get('REPLAY_LOG_DIR', '/var/log/flog'))
+
 @app.route('/alerting', methods=['GET', 'POST'])
 def alerting():
     if request.method == 'POST':
-        # Process alerting form data
-        alerting_data = request.form
-        # Implement alerting setup logic here
-        return 'Alerting setup in progress...'
+        # A rule from the form or a JSON body: name, kind, match, key, field, aggregate, op, value, window
+        alerting_data = request.get_json(silent=True) or request.form.to_dict()
+        try:
+            rule = alert_engine.add_rule(alerting_data)
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify(rule.to_dict()), 201
     return render_template('alerting.html')
 
+@app.route('/alerting/rules')
+def alerting_rules():
+    return jsonify([rule.to_dict() for rule in alert_engine.rules.values()])
+
+@app.route('/alerting/rules/<name>', methods=['DELETE'])
+def alerting_rule_delete(name):
+    if not alert_engine.remove_rule(name):
+        return jsonify({'error': 'unknown rule'}), 404
+    return '', 204
+
+@app.route('/alerting/alerts')
+def alerting_alerts():
+    try:
+        limit = int(request.args.get('limit', 100))
+    except ValueError:
+        limit = 0
+    if limit < 1:
+        return jsonify({'error': 'limit must be a positive integer'}), 400
+    return jsonify(alert_engine.recent_alerts(limit))
+
+@app.route('/alerting/replay', methods=['POST'])
+def alerting_replay():
+    # Evaluate the current rules over a stored NDJSON log file on the task queue
+    path = (request.get_json(silent=True) or request.form).get('path')
+    if not isinstance(path, str) or not path:
+        return jsonify({'error': 'path must name a log file in the replay log directory'}), 400
+    # Relative paths are taken from the log directory; symlinks and .. cannot lead out of it
+    path = os.path.realpath(os.path.join(replay_log_dir, path))
+    if os.path.commonpath([path, replay_log_dir]) != replay_log_dir or not os.path.isfile(path):
+        return jsonify({'error': 'path must name a log file in the replay log directory'}), 400
+    return submit_task('Alert replay', alert_engine.replay, path)
+
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000)
+    app.run(host='0.0.0.0', port=5000, threaded=True)
@@ -0,0 +1,338 @@
+import os
+import threading
+import time
+import zlib
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# Default batch size of a BulkWriter, and so the largest request body an Ingestor accepts
+MAX_BATCH_BYTES = 5 * 1024 * 1024
+
+
+class Backpressure(Exception):
+    """Raised when a sink's buffer is full and the caller should retry later"""
+
+
+class PayloadTooLarge(ValueError):
+    """Raised when a request body, once decompressed, is bigger than the Ingestor accepts"""
+
+
+def _base_url(host, default_port):
+    """Accept 'elasticsearch', 'elasticsearch:9200' or a full URL"""
+    if '://' in host:
+        return host.rstrip('/')
+    if ':' not in host:
+        host = f'{host}:{default_port}'
+    return f'http://{host}'
+
+
+def _session(pool_size):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class ElasticsearchSink:
+    """Writes batches of JSON documents through the Elasticsearch _bulk API"""
+    name = 'elasticsearch'
+    # The index is in the URL, so every document shares the same action line
+    ACTION = b'{"index":{}}\n'
+
+    def __init__(self, url, index, session):
+        self.url = f'{url}/{index}/_bulk'
+        self.session = session
+
+    def send(self, batch, timeout):
+        body = b''.join(self.ACTION + document + b'\n' for document in batch)
+        response = self.session.post(self.url, data=body, timeout=timeout,
+                                     headers={'Content-Type': 'application/x-ndjson'})
+        response.raise_for_status()
+        # Only walk the per-item results when something was rejected
+        if b'"errors":true' not in response.content[:200]:
+            return len(batch), 0
+        items = response.json().get('items', [])
+        failed = sum(1 for item in items if item.get('index', {}).get('status', 500) >= 300)
+        return len(batch) - failed, failed
+
+
+class InfluxSink:
+    """Writes batches of line-protocol points through the InfluxDB 1.x /write API"""
+    name = 'influxdb'
+
+    def __init__(self, url, database, session, precision='ns'):
+        self.url = url
+        self.write_url = f'{url}/write'
+        self.params = {'db': database, 'precision': precision}
+        self.database = database
+        self.session = session
+        self.database_ready = False
+
+    def send(self, batch, timeout):
+        if not self.database_ready:
+            # CREATE DATABASE is a no-op when it already exists
+            self.session.post(f'{self.url}/query', params={'q': f'CREATE DATABASE "{self.database}"'}, timeout=timeout)
+            self.database_ready = True
+        response = self.session.post(self.write_url, params=self.params, data=b'\n'.join(batch), timeout=timeout)
+        response.raise_for_status()
+        return len(batch), 0
+
+
+class BulkWriter:
+    """
+    In-memory buffer in front of one sink. Items are flushed by sender threads
+    when a batch reaches max_batch_items or max_batch_bytes, or when the oldest
+    buffered item is flush_interval seconds old. Buffered plus in-flight bytes
+    are capped at max_buffer_bytes; put() waits up to its timeout for room and
+    then raises Backpressure. Failed sends are retried with backoff, then dropped.
+    """
+
+    def __init__(self, sink, max_batch_items=5000, max_batch_bytes=MAX_BATCH_BYTES, flush_interval=1.0,
+                 max_buffer_bytes=64 * 1024 * 1024, senders=2, max_retries=3, backoff=0.5, timeout=30):
+        self.sink = sink
+        self.max_batch_items = max_batch_items
+        self.max_batch_bytes = max_batch_bytes
+        self.flush_interval = flush_interval
+        self.max_buffer_bytes = max_buffer_bytes
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+        self.buffer = []
+        self.buffered_bytes = 0
+        self.in_flight_bytes = 0
+        self.oldest = None
+        self.closing = False
+        self.condition = threading.Condition()
+        self.stats = {'accepted': 0, 'written': 0, 'failed': 0, 'dropped': 0,
+                      'batches': 0, 'retries': 0, 'backpressure': 0}
+        self.senders = [threading.Thread(target=self._send_loop, name=f'{sink.name}-writer-{i}', daemon=True)
+                        for i in range(senders)]
+        for sender in self.senders:
+            sender.start()
+
+    def put(self, items, size, timeout=0.0):
+        """Buffer already-validated items (size is their total bytes)"""
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            # An oversized request is still let through once the writer is idle, so it cannot wait forever
+            while (self.buffered_bytes + self.in_flight_bytes + size > self.max_buffer_bytes
+                   and (self.buffer or self.in_flight_bytes)):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.stats['backpressure'] += 1
+                    raise Backpressure(f'{self.sink.name} buffer full')
+                self.condition.wait(remaining)
+            if not self.buffer:
+                self.oldest = time.monotonic()
+            self.buffer.extend(items)
+            self.buffered_bytes += size
+            self.stats['accepted'] += len(items)
+            if len(self.buffer) >= self.max_batch_items or self.buffered_bytes >= self.max_batch_bytes:
+                self.condition.notify_all()
+
+    def _take_batch(self):
+        """Wait until a batch is due, then cut it from the buffer (called with the lock held)"""
+        while True:
+            if self.buffer:
+                due = (len(self.buffer) >= self.max_batch_items or self.buffered_bytes >= self.max_batch_bytes
+                       or self.closing)
+                wait = self.oldest + self.flush_interval - time.monotonic()
+                if due or wait <= 0:
+                    break
+            elif self.closing:
+                return None, 0
+            else:
+                wait = None
+            self.condition.wait(wait)
+
+        # Cut at max_batch_items or max_batch_bytes, whichever comes first, but always take one item
+        count = size = 0
+        for item in self.buffer[:self.max_batch_items]:
+            if count and size + len(item) > self.max_batch_bytes:
+                break
+            count += 1
+            size += len(item)
+        batch = self.buffer[:count]
+        del self.buffer[:count]
+        self.buffered_bytes -= size
+        self.in_flight_bytes += size
+        self.oldest = time.monotonic() if self.buffer else None
+        return batch, size
+
+    def _send_loop(self):
+        while True:
+            with self.condition:
+                batch, size = self._take_batch()
+            if batch is None:
+                return
+            written, failed = self._send(batch)
+            with self.condition:
+                self.in_flight_bytes -= size
+                self.stats['batches'] += 1
+                self.stats['written'] += written
+                self.stats['failed'] += failed
+                self.stats['dropped'] += len(batch) - written - failed
+                self.condition.notify_all()
+
+    def _send(self, batch):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.sink.send(batch, self.timeout)
+            except requests.RequestException as e:
+                status = e.response.status_code if getattr(e, 'response', None) is not None else None
+                # Client errors other than 429 will not succeed on retry
+                if status is not None and 400 <= status < 500 and status != 429:
+                    break
+                if attempt == self.max_retries:
+                    break
+                with self.condition:
+                    self.stats['retries'] += 1
+                time.sleep(self.backoff * (2 ** attempt))
+        return 0, 0
+
+    def flush(self, timeout=30):
+        """Wait until everything buffered so far has been sent"""
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            self.oldest = time.monotonic() - self.flush_interval if self.buffer else self.oldest
+            self.condition.notify_all()
+            while (self.buffer or self.in_flight_bytes) and time.monotonic() < deadline:
+                self.condition.wait(0.05)
+
+    def close(self, timeout=30):
+        with self.condition:
+            self.closing = True
+            self.condition.notify_all()
+        for sender in self.senders:
+            sender.join(timeout)
+
+
+class Ingestor:
+    """
+    Accepts raw NDJSON (logs, to Elasticsearch) and InfluxDB line protocol
+    (metrics, to InfluxDB) request bodies, validates them line by line without
+    full parsing, and hands them to a BulkWriter per sink. Bodies, compressed or not,
+    are capped at max_body_bytes, one batch's worth by default.
+    """
+
+    def __init__(self, elasticsearch_url=None, influxdb_url=None, index='flog-logs', database='flog',
+                 put_timeout=1.0, pool_size=8, max_body_bytes=None, **writer_options):
+        self.put_timeout = put_timeout
+        self.max_body_bytes = max_body_bytes or writer_options.get('max_batch_bytes', MAX_BATCH_BYTES)
+        session = _session(pool_size)
+        self.logs = self.metrics = None
+        if elasticsearch_url:
+            self.logs = BulkWriter(ElasticsearchSink(elasticsearch_url, index, session), **writer_options)
+        if influxdb_url:
+            self.metrics = BulkWriter(InfluxSink(influxdb_url, database, session), **writer_options)
+        self.rejected = {'logs': 0, 'metrics': 0}
+
+    @classmethod
+    def from_env(cls, **options):
+        """Sinks from ELASTICSEARCH_HOST / INFLUXDB_HOST (as set in docker-compose.yml)"""
+        elasticsearch = os.environ.get('ELASTICSEARCH_HOST')
+        influxdb = os.environ.get('INFLUXDB_HOST')
+        return cls(elasticsearch_url=_base_url(elasticsearch, 9200) if elasticsearch else None,
+                   influxdb_url=_base_url(influxdb, 8086) if influxdb else None,
+                   index=os.environ.get('INGEST_INDEX', 'flog-logs'),
+                   database=os.environ.get('INGEST_DATABASE', 'flog'),
+                   **options)
+
+    def decode(self, body, content_encoding=None):
+        """
+        The request body, gunzipped if needed. Decompression stops as soon as the output
+        passes max_body_bytes, so a small gzip bomb cannot expand in memory.
+        """
+        if content_encoding != 'gzip':
+            if len(body) > self.max_body_bytes:
+                raise PayloadTooLarge(f'body larger than {self.max_body_bytes} bytes')
+            return body
+        chunks = []
+        size = 0
+        # A gzip body may be several members back to back
+        while body:
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            try:
+                chunk = decompressor.decompress(body, self.max_body_bytes - size + 1)
+            except zlib.error:
+                raise ValueError('malformed gzip body')
+            size += len(chunk)
+            if size > self.max_body_bytes:
+                raise PayloadTooLarge(f'decompressed body larger than {self.max_body_bytes} bytes')
+            if not decompressor.eof:
+                raise ValueError('malformed gzip body')
+            chunks.append(chunk)
+            body = decompressor.unused_data
+        return b''.join(chunks)
+
+    @staticmethod
+    def parse_logs(body):
+        """Split an NDJSON body into its JSON object lines; returns (documents, bytes, rejected)"""
+        documents = []
+        size = rejected = 0
+        for line in body.split(b'\n'):
+            line = line.strip()
+            if not line:
+                continue
+            # Cheap shape check; Elasticsearch reports anything malformed per item
+            if line[:1] == b'{' and line[-1:] == b'}':
+                documents.append(line)
+                size += len(line)
+            else:
+                rejected += 1
+        return documents, size, rejected
+
+    @staticmethod
+    def parse_metrics(body):
+        """Split a line-protocol body into its points; returns (points, bytes, rejected)"""
+        points = []
+        size = rejected = 0
+        for line in body.split(b'\n'):
+            line = line.strip()
+            if not line or line[:1] == b'#':
+                continue
+            # measurement[,tags] fields [timestamp]
+            if b' ' in line and b'=' in line:
+                points.append(line)
+                size += len(line)
+            else:
+                rejected += 1
+        return points, size, rejected
+
+    def ingest_logs(self, body):
+        """Buffer every JSON object line of an NDJSON body; returns (accepted, rejected)"""
+        if self.logs is None:
+            raise LookupError('no Elasticsearch sink configured')
+        documents, size, rejected = self.parse_logs(body)
+        if documents:
+            self.logs.put(documents, size, self.put_timeout)
+        self.rejected['logs'] += rejected
+        return len(documents), rejected
+
+    def ingest_metrics(self, body):
+        """Buffer every line-protocol point of a body; returns (accepted, rejected)"""
+        if self.metrics is None:
+            raise LookupError('no InfluxDB sink configured')
+        points, size, rejected = self.parse_metrics(body)
+        if points:
+            self.metrics.put(points, size, self.put_timeout)
+        self.rejected['metrics'] += rejected
+        return len(points), rejected
+
+    def stats(self):
+        stats = {}
+        for kind, writer in (('logs', self.logs), ('metrics', self.metrics)):
+            if writer is not None:
+                with writer.condition:
+                    stats[kind] = dict(writer.stats, rejected=self.rejected[kind],
+                                       buffered_bytes=writer.buffered_bytes, in_flight_bytes=writer.in_flight_bytes)
+        return stats
+
+    def close(self):
+        for writer in (self.logs, self.metrics):
+            if writer is not None:
+                writer.close()
@@ -0,0 +1,288 @@
+import re
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+# (seconds per slot, slots kept): 1s for 10 minutes, 1m for a day, 1h for 30 days
+TIERS = ((1, 600), (60, 1440), (3600, 720))
+STATS = ('count', 'sum', 'min', 'max', 'mean', 'p50', 'p90', 'p95', 'p99')
+RANGE_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+class RollupRing:
+    """
+    One rollup tier of one series: a ring of `size` time slots of `resolution`
+    seconds, each holding count, sum, min, max and a log-scale histogram of the
+    values that fell into it. All state lives in preallocated NumPy arrays, so
+    memory is fixed; a slot is reset when the ring comes back around to it.
+    """
+
+    def __init__(self, resolution, size, edges):
+        self.resolution = resolution
+        self.size = size
+        self.edges = edges
+        self.slot_ids = np.full(size, -1, dtype=np.int64)
+        self.counts = np.zeros(size, dtype=np.int64)
+        self.sums = np.zeros(size)
+        self.mins = np.full(size, np.inf)
+        self.maxs = np.full(size, -np.inf)
+        self.histograms = np.zeros((size, len(edges) + 1), dtype=np.float32)
+        self.head = -1
+
+    def add(self, timestamps, values, bins):
+        """Fold a batch of points (epoch seconds, values and their histogram bins) into the ring"""
+        slots = (timestamps // self.resolution).astype(np.int64)
+        self.head = max(self.head, int(slots.max()))
+        # Points older than the ring's span are dropped here; coarser tiers still keep them
+        live = slots > self.head - self.size
+        if not live.all():
+            slots, values, bins = slots[live], values[live], bins[live]
+            if not len(slots):
+                return
+        unique, inverse = np.unique(slots, return_inverse=True)
+        positions = unique % self.size
+        stale = self.slot_ids[positions] != unique
+        if stale.any():
+            reset = positions[stale]
+            self.slot_ids[reset] = unique[stale]
+            self.counts[reset] = 0
+            self.sums[reset] = 0.0
+            self.mins[reset] = np.inf
+            self.maxs[reset] = -np.inf
+            self.histograms[reset] = 0
+
+        self.counts[positions] += np.bincount(inverse, minlength=len(unique))
+        self.sums[positions] += np.bincount(inverse, weights=values, minlength=len(unique))
+        rows = positions[inverse]
+        np.minimum.at(self.mins, rows, values)
+        np.maximum.at(self.maxs, rows, values)
+        width = self.histograms.shape[1]
+        counts = np.bincount(inverse * width + bins, minlength=len(unique) * width)
+        self.histograms[positions] += counts.reshape(len(unique), width)
+
+    def oldest(self):
+        """Start (epoch seconds) of the oldest slot the ring can still hold"""
+        return (self.head - self.size + 1) * self.resolution
+
+    def select(self, start, end):
+        """Ring positions of the non-empty slots in [start, end], in time order"""
+        # Slots the ring has moved past may linger until overwritten, so clamp to its span
+        first = max(int(start // self.resolution), self.head - self.size + 1)
+        last = int(end // self.resolution)
+        positions = np.flatnonzero((self.slot_ids >= first) & (self.slot_ids <= last) & (self.counts > 0))
+        return positions[np.argsort(self.slot_ids[positions])]
+
+
+class MetricRollups:
+    """
+    Pre-aggregated metric series for dashboards. Points are folded into every
+    tier of TIERS as they arrive; query() picks the finest tier that still covers
+    the requested range, computes the statistic per slot and downsamples the
+    result with LTTB, so a chart never touches raw points. Percentiles come from
+    the per-slot histograms (relative error about half a bin, ~12% by default).
+    At most max_series series are kept; points for further series are counted
+    as dropped. Millisecond, microsecond and nanosecond timestamps are scaled to
+    seconds, and points more than max_skew seconds in the future are counted as
+    future and dropped, since one of them would move every ring past the present.
+    """
+
+    def __init__(self, tiers=TIERS, bins=96, low=1e-2, high=1e7, max_series=100, max_skew=300):
+        self.tiers = tuple(tiers)
+        # Bin 0 takes everything up to `low` (zero and negatives included), the last bin everything above `high`
+        self.edges = np.logspace(np.log10(low), np.log10(high), bins - 1)
+        self.bin_values = np.concatenate(([low], np.sqrt(self.edges[:-1] * self.edges[1:]), [high]))
+        self.max_series = max_series
+        self.max_skew = max_skew
+        self.series = {}
+        self.lock = threading.Lock()
+        self.stats = {'points': 0, 'dropped': 0, 'future': 0}
+
+    def record(self, series, timestamps, values):
+        """Add points to one series; timestamps are epoch seconds (or ms, µs, ns)"""
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        # Same magnitudes as alerting.event_time: nanoseconds, microseconds, then milliseconds
+        timestamps = np.where(timestamps > 1e17, timestamps / 1e9,
+                              np.where(timestamps > 1e14, timestamps / 1e6,
+                                       np.where(timestamps > 1e11, timestamps / 1e3, timestamps)))
+        future = timestamps > time.time() + self.max_skew
+        if future.any():
+            with self.lock:
+                self.stats['future'] += int(future.sum())
+        keep = np.isfinite(values) & np.isfinite(timestamps) & ~future
+        timestamps, values = timestamps[keep], values[keep]
+        if not len(values):
+            return 0
+        bins = np.searchsorted(self.edges, values, side='right')
+        with self.lock:
+            rings = self.series.get(series)
+            if rings is None:
+                if len(self.series) >= self.max_series:
+                    self.stats['dropped'] += len(values)
+                    return 0
+                rings = self.series[series] = [RollupRing(resolution, size, self.edges)
+                                               for resolution, size in self.tiers]
+            for ring in rings:
+                ring.add(timestamps, values, bins)
+            self.stats['points'] += len(values)
+        return len(values)
+
+    def record_line_protocol(self, body, now=None):
+        """Add every numeric field of an InfluxDB line-protocol body, as series 'measurement.field'"""
+        points = parse_line_protocol(body, now)
+        return sum(self.record(series, timestamps, values) for series, (timestamps, values) in points.items())
+
+    def list_series(self):
+        with self.lock:
+            return sorted(self.series)
+
+    def _statistic(self, ring, positions, stat):
+        counts = ring.counts[positions]
+        if stat == 'count':
+            return counts.astype(np.float64)
+        if stat == 'sum':
+            return ring.sums[positions]
+        if stat == 'min':
+            return ring.mins[positions]
+        if stat == 'max':
+            return ring.maxs[positions]
+        if stat == 'mean':
+            return ring.sums[positions] / counts
+        return self._percentile(ring.histograms[positions], counts, float(stat[1:]) / 100,
+                                ring.mins[positions], ring.maxs[positions])
+
+    def _percentile(self, histograms, counts, quantile, mins, maxs):
+        cumulative = np.cumsum(histograms, axis=1)
+        targets = np.maximum(quantile * counts, 1)
+        chosen = (cumulative < targets[:, None]).sum(axis=1)
+        # A bin's representative value can lie outside what was actually seen
+        return np.clip(self.bin_values[np.minimum(chosen, len(self.bin_values) - 1)], mins, maxs)
+
+    def query(self, series, start=None, end=None, points=500, stat='mean'):
+        """
+        Chart data for one series between start and end (epoch seconds; default the
+        last hour): up to `points` [time, value] pairs plus a summary of the whole range.
+        """
+        if stat not in STATS:
+            raise ValueError(f'stat must be one of {", ".join(STATS)}')
+        end = time.time() if end is None else float(end)
+        start = end - 3600 if start is None else float(start)
+        if start >= end:
+            raise ValueError('start must be before end')
+        with self.lock:
+            rings = self.series.get(series)
+            if rings is None:
+                raise KeyError(series)
+            # The finest tier whose ring reaches back to start (give or take its first, partial slot)
+            ring = next((ring for ring in rings if ring.oldest() - ring.resolution <= start), rings[-1])
+            positions = ring.select(start, end)
+            times = ring.slot_ids[positions] * ring.resolution
+            values = self._statistic(ring, positions, stat)
+            summary = self._summary(ring, positions)
+        times, values = lttb(times.astype(np.float64), values, points)
+        return {
+            'series': series,
+            'stat': stat,
+            'resolution': ring.resolution,
+            'start': start,
+            'end': end,
+            'points': [[float(t), float(v)] for t, v in zip(times, values)],
+            'summary': summary,
+        }
+
+    def _summary(self, ring, positions):
+        count = int(ring.counts[positions].sum())
+        if not count:
+            return {'count': 0}
+        histogram = ring.histograms[positions].sum(axis=0, keepdims=True)
+        low, high = ring.mins[positions].min(), ring.maxs[positions].max()
+        summary = {'count': count, 'min': float(low), 'max': float(high),
+                   'mean': float(ring.sums[positions].sum() / count)}
+        for stat in ('p50', 'p90', 'p95', 'p99'):
+            summary[stat] = float(self._percentile(histogram, np.array([count]), float(stat[1:]) / 100,
+                                                   low, high)[0])
+        return summary
+
+    def memory_bytes(self):
+        with self.lock:
+            return sum(ring.slot_ids.nbytes + ring.counts.nbytes + ring.sums.nbytes + ring.mins.nbytes
+                       + ring.maxs.nbytes + ring.histograms.nbytes for rings in self.series.values() for ring in rings)
+
+
+def lttb(x, y, points):
+    """
+    Largest-Triangle-Three-Buckets downsampling: keep the first and last point and,
+    from each of points - 2 equal buckets in between, the point forming the largest
+    triangle with the previously kept point and the next bucket's average.
+    """
+    if points >= len(x) or points < 3:
+        return x, y
+    keep = np.zeros(points, dtype=np.int64)
+    keep[-1] = len(x) - 1
+    bounds = np.linspace(1, len(x) - 1, points - 1).astype(np.int64)
+    previous = 0
+    for bucket in range(points - 2):
+        lo, hi = bounds[bucket], bounds[bucket + 1]
+        next_hi = bounds[bucket + 2] if bucket + 2 < len(bounds) else len(x)
+        average_x = x[hi:next_hi].mean() if next_hi > hi else x[-1]
+        average_y = y[hi:next_hi].mean() if next_hi > hi else y[-1]
+        areas = np.abs((x[previous] - average_x) * (y[lo:hi] - y[previous])
+                       - (x[previous] - x[lo:hi]) * (average_y - y[previous]))
+        previous = lo + int(np.argmax(areas))
+        keep[bucket + 1] = previous
+    return x[keep], y[keep]
+
+
+def parse_line_protocol(body, now=None):
+    """
+    {'measurement.field': (timestamps, values)} for the numeric fields of a line-protocol
+    body (nanosecond timestamps; lines without one get `now`). String and boolean
+    fields, comments and malformed lines are skipped.
+    """
+    now = time.time() if now is None else now
+    points = {}
+    for line in body.split(b'\n'):
+        line = line.strip()
+        if not line or line[:1] == b'#':
+            continue
+        # measurement[,tag=value...] field=value[,field=value...] [timestamp]; escaped spaces only occur in keys
+        parts = re.split(rb'(?<!\\) ', line)
+        if len(parts) < 2:
+            continue
+        timestamp = now
+        if len(parts) > 2 and parts[-1].isdigit():
+            timestamp = int(parts[-1]) / 1e9
+            parts = parts[:-1]
+        measurement = parts[0].split(b',', 1)[0].decode('utf-8', 'replace')
+        for field in b' '.join(parts[1:]).split(b','):
+            key, _, value = field.partition(b'=')
+            if value.endswith((b'i', b'u')):
+                value = value[:-1]
+            try:
+                number = float(value)
+            except ValueError:
+                continue   # strings, booleans and pieces of quoted strings
+            series = points.setdefault(f"{measurement}.{key.decode('utf-8', 'replace')}", ([], []))
+            series[0].append(timestamp)
+            series[1].append(number)
+    return points
+
+
+def parse_time(value, default=None):
+    """Epoch seconds from a number or an ISO 8601 string"""
+    if value in (None, ''):
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+
+
+def parse_range(text):
+    """'15m', '24h', '30d' -> seconds"""
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)([smhd])', text.strip())
+    if not match:
+        raise ValueError('range must look like 30s, 15m, 24h or 30d')
+    return float(match.group(1)) * RANGE_UNITS[match.group(2)]
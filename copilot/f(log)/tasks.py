@@ -0,0 +1,163 @@
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+FINISHED_STATES = (SUCCEEDED, FAILED)
+
+
+class QueueFull(Exception):
+    """Raised by TaskQueue.submit when every worker is busy and the backlog is at its limit"""
+
+
+class Task:
+    """One background job: its state, progress and the ordered list of progress events"""
+
+    def __init__(self, kind, max_events=200):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.state = QUEUED
+        self.progress = 0
+        self.message = 'Queued'
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.events = deque(maxlen=max_events)
+        self.event_count = 0
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'state': self.state,
+            'progress': self.progress,
+            'message': self.message,
+            'result': self.result,
+            'error': self.error,
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+        }
+
+
+class TaskQueue:
+    """
+    Bounded background worker pool for long-running setup jobs.
+
+    submit() returns a task ID straight away; the job runs on one of max_workers
+    threads and reports progress through the callback it is given. At most
+    max_pending jobs may wait or run at once, beyond that submit() raises QueueFull.
+    Finished tasks are kept (up to keep_finished) so their status can still be read.
+    """
+
+    def __init__(self, max_workers=4, max_pending=64, keep_finished=1000):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='task')
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.keep_finished = keep_finished
+        self.tasks = OrderedDict()
+        self.changed = threading.Condition()
+
+    def submit(self, kind, func, *args, **kwargs):
+        """Queue func(*args, progress=callback, **kwargs) and return the new task's ID"""
+        if not self.slots.acquire(blocking=False):
+            raise QueueFull(f'{kind}: too many tasks in progress')
+        task = Task(kind)
+        with self.changed:
+            self.tasks[task.id] = task
+            self._event(task)
+            self._prune()
+        self.executor.submit(self._run, task, func, args, kwargs)
+        return task.id
+
+    def _run(self, task, func, args, kwargs):
+        def progress(percent=None, message=None):
+            self.update(task, percent=percent, message=message)
+
+        try:
+            self.update(task, state=RUNNING, message='Started')
+            result = func(*args, progress=progress, **kwargs)
+            self.update(task, state=SUCCEEDED, percent=100, message='Completed', result=result)
+        except Exception as e:
+            self.update(task, state=FAILED, message='Failed', error=f'{type(e).__name__}: {e}')
+        finally:
+            self.slots.release()
+
+    def update(self, task, state=None, percent=None, message=None, result=None, error=None):
+        with self.changed:
+            if state:
+                task.state = state
+                if state == RUNNING:
+                    task.started = time.time()
+                elif state in FINISHED_STATES:
+                    task.finished = time.time()
+            if percent is not None:
+                task.progress = max(0, min(100, int(percent)))
+            if message is not None:
+                task.message = message
+            if result is not None:
+                task.result = result if _is_json(result) else str(result)
+            if error is not None:
+                task.error = error
+            self._event(task)
+            self.changed.notify_all()
+
+    def _event(self, task):
+        task.event_count += 1
+        task.events.append((task.event_count, task.to_dict()))
+
+    def _prune(self):
+        finished = [task_id for task_id, task in self.tasks.items() if task.state in FINISHED_STATES]
+        for task_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self.tasks[task_id]
+
+    def get(self, task_id):
+        with self.changed:
+            task = self.tasks.get(task_id)
+            return task.to_dict() if task else None
+
+    def list(self, limit=50):
+        with self.changed:
+            return [task.to_dict() for task in list(self.tasks.values())[-limit:]]
+
+    def stream(self, task_id, last_event_id=0, heartbeat=15.0):
+        """
+        Server-sent events for one task: every progress event after last_event_id,
+        then new ones as they happen, until the task finishes. A comment line is
+        sent every heartbeat seconds so proxies keep the connection open.
+        """
+        while True:
+            with self.changed:
+                task = self.tasks.get(task_id)
+                if task is None:
+                    return
+                pending = [(number, data) for number, data in task.events if number > last_event_id]
+                if not pending and task.state not in FINISHED_STATES:
+                    self.changed.wait(heartbeat)
+                    pending = [(number, data) for number, data in task.events if number > last_event_id]
+                done = task.state in FINISHED_STATES
+            if not pending and not done:
+                yield ': keep-alive\n\n'
+            for number, data in pending:
+                last_event_id = number
+                yield f'id: {number}\nevent: {data["state"]}\ndata: {json.dumps(data)}\n\n'
+            if done and not pending:
+                return
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
+
+
+def _is_json(value):
+    try:
+        json.dumps(value)
+        return True
+    except (TypeError, ValueError):
+        return False
@@ -0,0 +1,32 @@
+import time
+import unittest
+
+from monitoring import MetricRollups
+
+
+class MetricRollupsTimestampTest(unittest.TestCase):
+
+    def test_future_points_are_dropped(self):
+        rollups = MetricRollups()
+        now = time.time()
+        self.assertEqual(rollups.record('cpu', [now], [1.0]), 1)
+        heads = [ring.head for ring in rollups.series['cpu']]
+
+        # A day ahead, past the allowed skew: counted, but the rings do not move
+        self.assertEqual(rollups.record('cpu', [now + 86400], [2.0]), 0)
+        self.assertEqual(rollups.stats['future'], 1)
+        self.assertEqual([ring.head for ring in rollups.series['cpu']], heads)
+        points = rollups.query('cpu', now - 60, now + 60, stat='count')['points']
+        self.assertEqual([value for _, value in points], [1.0])
+
+    def test_sub_second_epochs_are_scaled(self):
+        rollups = MetricRollups()
+        now = int(time.time())
+        for scale in (1e3, 1e6, 1e9):
+            self.assertEqual(rollups.record('cpu', [now * scale], [1.0]), 1)
+        self.assertEqual(rollups.stats['future'], 0)
+        self.assertEqual([ring.head for ring in rollups.series['cpu']][0], now)
+
+
+if __name__ == '__main__':
+    unittest.main()